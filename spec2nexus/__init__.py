@@ -4,16 +4,46 @@
 
 __package__ = "spec2nexus"
 
-try:
-    from setuptools_scm import get_version
 
-    __version__ = get_version(root="..", relative_to=__file__)
-    del get_version
+def _get_version():
+    """
+    Version of this package (without running git when installed).
 
-except (LookupError, ModuleNotFoundError):
+    In order:  the ``_version.py`` file written by setuptools_scm when the
+    package is built (or installed), the installed package metadata, then
+    (only in a source checkout that was not installed) setuptools_scm.
+    """
+    try:
+        from ._version import version
+
+        return version
+    except ImportError:
+        pass
+
+    from importlib.metadata import PackageNotFoundError
     from importlib.metadata import version
 
-    __version__ = version(__package__)
+    try:
+        return version(__package__)
+    except PackageNotFoundError:
+        pass
+
+    try:
+        from setuptools_scm import get_version
+
+        return get_version(root="..", relative_to=__file__)
+    except (LookupError, ModuleNotFoundError):
+        return "0+unknown"
+
+
+def __getattr__(name):
+    # The version is found when first used, not when the package is imported.
+    if name == "__version__":
+        global __version__
+        __version__ = _get_version()
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # -----------------------------------------------------------------------------
 # :author:    Pete R. Jemian
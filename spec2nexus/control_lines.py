@@ -8,6 +8,8 @@ from .plugin_core import ControlLineBase
 from .plugin_core import install_user_plugin
 
 import pathlib
+import re
+import sys
 
 
 def _plugin_files():
@@ -21,18 +23,32 @@ def _plugin_files():
 
 
 class ControlLines:
-    """Access the installed set of control line handling plugins."""
+    """
+    Access the installed set of control line handling plugins.
+
+    Plugin files listed in the manifest (:data:`spec2nexus.plugins.MANIFEST`)
+    are imported when a control line matches one of their keys.
+    """
 
     def __init__(self):
+        from .plugins import MANIFEST
+
+        self._pending = {}  # plugin file: keys, for files not imported yet
         for plugin_file in _plugin_files():
             if plugin_file.name.startswith("_"):
                 continue
             if plugin_file.suffix not in (".py",):
                 continue
-            install_user_plugin(plugin_file)
+            manifest = MANIFEST.get(plugin_file.stem)
+            if manifest is None:
+                install_user_plugin(plugin_file)
+            else:
+                self._defer_plugin_(plugin_file, **manifest)
+        self._build_dispatch_table_()
 
     @property
     def known_keys(self):
+        self._load_pending_()  # all of them
         return ControlLineBase.known_keys
 
     @property
@@ -53,7 +69,7 @@ class ControlLines:
         key = spec_data_file_line[:pos]
 
         # try to locate the key directly
-        if key in self.known_keys:
+        if key in ControlLineBase.known_keys:
             return key
 
         # brute force search and match using regular expressions
@@ -71,17 +87,127 @@ class ControlLines:
         ``key`` as the regular expression to match with ``text``.
         """
 
-        for key, plugin in self.known_keys.items():
-            if plugin.match_key(text):
-                return key
+        key = self._matched.get(text)
+        if key is not None:
+            return key
+
+        if len(self._pending) > 0:
+            self._load_pending_(text)
+        if self._num_plugins != len(ControlLineBase.plugins):
+            self._build_dispatch_table_()  # plugins were added
+
+        for regexp, keys, plugin in self._dispatch_table:
+            if regexp is None:
+                # plugin has its own match_key() method
+                if plugin.match_key(text):
+                    return keys
+            elif len(text) > 0:
+                match = regexp.match(text)
+                if match is not None:
+                    key = keys[match.lastgroup]
+                    self._matched[text] = key
+                    return key
 
         return None
 
+    def _build_dispatch_table_(self):
+        """
+        (internal) Prepare to match text with the keys of all plugins.
+
+        The dispatch table keeps the order of the plugins.  Each
+        run of plugins that match by regular expression (their ``key``)
+        is combined into one (compiled) regular expression.  A plugin
+        with its own ``match_key()`` method is called as before.
+        """
+        table = []
+        patterns = {}  # group name: key
+
+        def combine_patterns():
+            if len(patterns) > 0:
+                alternatives = "|".join(
+                    f"(?P<{name}>{key})" for name, key in patterns.items()
+                )
+                # same as ControlLineBase.match_key(): match the whole text
+                regexp = re.compile(f"^(?:{alternatives})$")
+                table.append((regexp, dict(patterns), None))
+                patterns.clear()
+
+        for key, plugin in ControlLineBase.known_keys.items():
+            if _is_simple_pattern(key, plugin):
+                patterns[f"_key{len(table)}_{len(patterns)}"] = key
+            else:
+                combine_patterns()
+                table.append((None, key, plugin))
+        combine_patterns()
+
+        self._dispatch_table = table
+        self._matched = {}  # text: key, for text matched by regular expression
+        self._num_plugins = len(ControlLineBase.plugins)
+
     def process(self, key, *args, **kw):
         """Pick the control line handler by key & call its ``process`` method."""
-        handler = self.known_keys[key]
-        if handler is not None:
-            handler.process(*args, **kw)
+        handler = ControlLineBase.known_keys.get(key)
+        if handler is None:
+            self._load_pending_(key)
+            handler = ControlLineBase.known_keys[key]
+        handler.process(*args, **kw)
+
+    def _defer_plugin_(self, plugin_file, keys=(), scan_attributes=()):
+        """(internal) Import this plugin file when one of its keys is first needed."""
+        for attr in scan_attributes:
+            # scan attributes are known (as for imported plugins)
+            if attr not in ControlLineBase.lazy_attributes:
+                ControlLineBase.lazy_attributes.append(attr)
+        self._pending[plugin_file] = list(keys)
+        self._pending_regexp = _any_key_pattern(
+            key for keys in self._pending.values() for key in keys
+        )
+
+    def _load_pending_(self, text=None):
+        """
+        (internal) Import the deferred plugin files with a key that matches text.
+
+        With ``text=None``, import all deferred plugin files.
+        """
+        if len(self._pending) == 0:
+            return
+        if text is not None and self._pending_regexp.match(text) is None:
+            if not any(text in keys for keys in self._pending.values()):
+                return  # most text:  no plugin file to import
+        for plugin_file, keys in list(self._pending.items()):
+            # a key registered already (by a user plugin) overrides this plugin file
+            keys = [key for key in keys if key not in ControlLineBase.known_keys]
+            self._pending[plugin_file] = keys
+            if text is None or text in keys or (len(keys) > 0 and _any_key_pattern(keys).match(text)):
+                del self._pending[plugin_file]
+                if plugin_file.stem not in sys.modules:
+                    # (could be imported already, such as in a worker process)
+                    registered = dict(ControlLineBase.known_keys)
+                    install_user_plugin(plugin_file)
+                    # as if imported first:  keys registered before are not replaced
+                    ControlLineBase.known_keys.update(registered)
+        self._pending_regexp = _any_key_pattern(
+            key for keys in self._pending.values() for key in keys
+        )
+
+
+def _any_key_pattern(keys):
+    """(internal) Regular expression that matches (the whole text) with any of keys."""
+    # same as ControlLineBase.match_key()
+    return re.compile("^(?:" + "|".join(keys) + ")$")
+
+
+def _is_simple_pattern(key, plugin):
+    """(internal) Can this plugin's key be combined with others into one pattern?"""
+    if type(plugin).match_key is not ControlLineBase.match_key:
+        return False  # plugin has its own match_key() method
+    if not isinstance(key, str):
+        return False
+    try:
+        # groups in the key would interfere with the combined pattern
+        return re.compile(key).groups == 0
+    except re.error:
+        return False
 
 
 control_line_registry = ControlLines()  # singleton
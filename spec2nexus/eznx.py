@@ -58,9 +58,10 @@ The resulting (binary) data file has this structure::
 
 """
 
-import h5py  # HDF5 support
 import numpy
 
+CHUNK_BYTES = 256 * 1024  # target size of a chunk, see chunk_shape()
+
 
 def makeFile(filename, **attr):
     """
@@ -74,6 +75,8 @@ def makeFile(filename, **attr):
     :param dict attr: optional dictionary of attributes
     :return: h5py file object
     """
+    import h5py  # HDF5 support (imported when first needed)
+
     obj = h5py.File(filename, "w")
     addAttributes(obj, **attr)
     return obj
@@ -116,7 +119,7 @@ def openGroup(parent, name, nx_class, **attr):
     return group
 
 
-def makeDataset(parent, name, data=None, **attr):
+def makeDataset(parent, name, data=None, dataset_options=None, dtype=None, **attr):
     """
     create and write data to a dataset in the HDF5 file hierarchy
 
@@ -126,46 +129,128 @@ def makeDataset(parent, name, data=None, **attr):
     :param obj parent: parent group
     :param str name: valid NeXus dataset name
     :param obj data: the information to be written
+    :param dict dataset_options: optional dictionary of options
+        for ``create_dataset()``, such as ``chunks``,
+        ``compression``, ``compression_opts``, and ``shuffle``
+        (default: contiguous, no filters)
+    :param obj dtype: optional data type of the dataset
+        (default: decided from ``data``)
     :param dict attr: optional dictionary of attributes
     :return: h5py dataset object
+
+    Numeric arrays (and buffers, such as a ``memoryview``) are
+    written directly, without a copy.  Text is written as ASCII bytes.
     """
+    dataset_options = dataset_options or {}
     if data is None:
         obj = parent.create_dataset(name, data="")
         attr["NOTE"] = "no data supplied, value set to empty string"
     else:
-        # storing-a-list-of-strings-to-a-hdf5-dataset-from-python
-        # https://stackoverflow.com/questions/23220513/
-        # [n.encode("ascii", "ignore") for n in data]
-        def encoder(value):
-            if isinstance(value, str):
-                return value.encode("ascii", "ignore")
-            return value
-
-        if not isinstance(data, (tuple, list, numpy.ndarray)):
-            data = [
-                data,
-            ]
-        obj = parent.create_dataset(name, data=list(map(encoder, data)))
+        obj = parent.create_dataset(
+            name, data=_dataset_value(data, dtype), **dataset_options
+        )
     addAttributes(obj, **attr)
     return obj
 
 
-def write_dataset(parent, name, data, **attr):
+def _dataset_value(data, dtype=None):
+    """(internal) prepare data for ``create_dataset()``, as an array if possible"""
+    if isinstance(data, memoryview):
+        data = numpy.asarray(data)  # buffer: no copy
+    elif not isinstance(data, (tuple, list, numpy.ndarray)):
+        data = [
+            data,
+        ]
+    if dtype is not None:
+        return numpy.asarray(data, dtype=dtype)
+
+    if isinstance(data, numpy.ndarray):
+        if data.dtype.kind in "biufc":
+            return data  # numbers: write the array directly
+        if data.dtype.kind == "U":
+            return _ascii_strings(data.ravel().tolist()).reshape(data.shape)
+    elif len(data) > 0 and all(isinstance(v, str) for v in data):
+        return _ascii_strings(data)
+    else:
+        try:
+            arr = numpy.asarray(data)
+        except ValueError:
+            arr = None  # such as a ragged list
+        if arr is not None and arr.dtype.kind in "biufc":
+            return arr  # numbers: not as Python objects in h5py
+
+    # storing-a-list-of-strings-to-a-hdf5-dataset-from-python
+    # https://stackoverflow.com/questions/23220513/
+    # [n.encode("ascii", "ignore") for n in data]
+    def encoder(value):
+        if isinstance(value, str):
+            return value.encode("ascii", "ignore")
+        return value
+
+    return list(map(encoder, data))
+
+
+def _ascii_strings(text):
+    """(internal) array of variable-length ASCII strings, for a list of str"""
+    import h5py
+
+    # Encoding with str.encode() is faster than with numpy.char.encode().
+    # With the data type given, h5py need not check the type of each item.
+    return numpy.array(
+        [v.encode("ascii", "ignore") for v in text],
+        dtype=h5py.string_dtype("ascii"),
+    )
+
+
+def write_dataset(parent, name, data, dataset_options=None, dtype=None, **attr):
     """write to the NeXus HDF5 dataset, create it if necessary, return the object
 
     :param obj parent: h5py parent object
     :param str name: valid NeXus dataset name to write
     :param obj data: the information to be written
+    :param dict dataset_options: optional dictionary of options
+        for ``create_dataset()`` (see :func:`makeDataset`)
+    :param obj dtype: optional data type of the dataset
+        (default: decided from ``data``)
     :param dict attr: optional dictionary of attributes
     """
     if name in parent:
         # dataset already exists
         # delete it, any links to it may break
         del parent[name]
-    dset = makeDataset(parent, name, data, **attr)
+    dset = makeDataset(
+        parent, name, data, dataset_options=dataset_options, dtype=dtype, **attr
+    )
     return dset
 
 
+def chunk_shape(shape, itemsize, target=CHUNK_BYTES):
+    """
+    return a chunk shape (about ``target`` bytes) for an array dataset
+
+    :param tuple shape: shape of the array
+    :param int itemsize: number of bytes in each item of the array
+    :param int target: size (bytes) of a chunk, at most (unless one item is larger)
+
+    Whole rows along the last axis (such as all the channels of an
+    MCA spectrum) are kept together, then as many as fit along the
+    axes before it (from last to first).  Examples, with ``itemsize=8``::
+
+        (1353, 256)         ->  (128, 256)     2-D MCA spectra
+        (41, 41, 1024)      ->  (1, 32, 1024)  3-D MCA spectra from a mesh
+        (1_000_000,)        ->  (32768,)
+    """
+    chunks = [1] * len(shape)
+    size = itemsize
+    for axis in reversed(range(len(shape))):
+        n = max(1, min(shape[axis], target // size))
+        chunks[axis] = n
+        size *= n
+        if n < shape[axis]:
+            break  # chunk is full
+    return tuple(chunks)
+
+
 def makeLink(parent, sourceObject, targetName):
     """
     create an internal NeXus (hard) link in an HDF5 file
@@ -202,6 +287,8 @@ def makeExternalLink(hdf5FileObject, sourceFile, sourcePath, targetPath):
 
     This routine is provided as a reminder how to do this simple operation.
     """
+    import h5py
+
     hdf5FileObject[targetPath] = h5py.ExternalLink(sourceFile, sourcePath)
 
 
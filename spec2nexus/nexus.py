@@ -62,6 +62,17 @@ def get_user_parameters():
         help="overwrite output file if it exists",
         default=False,
     )
+    msg = "update an existing output file (from the same SPEC data file)"
+    msg += ", write only new and changed scans"
+    msg += " (with -f: overwrite a file that cannot be updated)"
+    parser.add_argument(
+        "-u",
+        "--update",
+        action="store_true",
+        dest="update",
+        help=msg,
+        default=False,
+    )
     parser.add_argument("-v", "--version", action="version", version=__version__)
     msg = "specify which scans to save"
     msg += ", such as: -s all  or  -s 1  or  -s 1,2,3-5  (no spaces!)"
@@ -85,6 +96,90 @@ def get_user_parameters():
         dest="output_filename",
         help=msg)
 
+    msg = "interpret scans in N parallel processes"
+    msg += ", default = 1 (no parallel processes)"
+    parser.add_argument(
+        "-p",
+        "--processes",
+        action="store",
+        type=int,
+        dest="processes",
+        default=1,
+        help=msg,
+    )
+
+    msg = "compress arrays of numbers with this HDF5 filter"
+    msg += ", default: no compression"
+    parser.add_argument(
+        "-c",
+        "--compression",
+        action="store",
+        choices=writer.COMPRESSION_FILTERS,
+        dest="compression",
+        default=None,
+        help=msg,
+    )
+    msg = "gzip compression level (0-9)"
+    parser.add_argument(
+        "--compression-level",
+        action="store",
+        type=int,
+        choices=range(10),
+        metavar="{0..9}",
+        dest="compression_opts",
+        default=None,
+        help=msg,
+    )
+    msg = "use the HDF5 shuffle filter (before compression)"
+    parser.add_argument(
+        "--shuffle",
+        action="store_true",
+        dest="shuffle",
+        default=False,
+        help=msg,
+    )
+    msg = "arrays with fewer items are not compressed"
+    msg += ", default = %d" % writer.COMPRESSION_MIN_SIZE
+    parser.add_argument(
+        "--compression-min-size",
+        action="store",
+        type=int,
+        dest="min_size",
+        default=writer.COMPRESSION_MIN_SIZE,
+        help=msg,
+    )
+    msg = "write arrays of numbers in the smallest data type"
+    msg += " that holds them exactly (such as counts as integers)"
+    msg += ", only arrays of at least %d items" % writer.NARROW_MIN_SIZE
+    parser.add_argument(
+        "--narrow",
+        action="store_true",
+        dest="narrow",
+        default=False,
+        help=msg,
+    )
+
+    msg = "keep the output file up to date as SPEC writes the data file"
+    msg += ", readers may follow the last scan in HDF5 SWMR mode, stop with ^C"
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        dest="mirror",
+        default=False,
+        help=msg,
+    )
+    msg = "with --mirror, read the SPEC data file every SECONDS"
+    msg += ", default = %g" % writer.MIRROR_INTERVAL
+    parser.add_argument(
+        "--mirror-interval",
+        action="store",
+        type=float,
+        metavar="SECONDS",
+        dest="mirror_interval",
+        default=writer.MIRROR_INTERVAL,
+        help=msg,
+    )
+
     #     parser.add_argument('-t',
     #                         '--tree-only',
     #                         action='store_true',
@@ -113,7 +208,15 @@ def get_user_parameters():
         help=msg,
     )
 
-    return parser.parse_args()
+    user_parms = parser.parse_args()
+    if user_parms.compression_opts is not None and user_parms.compression != "gzip":
+        parser.error("--compression-level is used only with --compression gzip")
+    if user_parms.mirror:
+        if len(user_parms.infile) > 1:
+            parser.error("--mirror follows only one SPEC data file")
+        if user_parms.scan_list != SCAN_LIST_ALL:
+            parser.error("--mirror writes all scans, do not use with --scan")
+    return user_parms
 
 
 def parse_scan_list_spec(scan_list_spec):
@@ -158,6 +261,27 @@ def pick_scans(all_scans, opt_scan_list):
     return scan_list
 
 
+def mirror(out, nexus_output_file_name, user_parms):
+    """keep the NeXus HDF5 file up to date with the SPEC data file (until interrupted)"""
+
+    def report(written):
+        if user_parms.reporting_level in (REPORTING_VERBOSE):
+            print("  wrote scan number(s): " + ", ".join(map(str, written)))
+
+    if user_parms.reporting_level in (REPORTING_STANDARD, REPORTING_VERBOSE,):
+        print("mirror to NeXus HDF5 file: " + nexus_output_file_name + "  (^C to stop)")
+    follower = writer.Mirror(out, nexus_output_file_name, overwrite=user_parms.force_write)
+    try:
+        follower.run(user_parms.mirror_interval, callback=report)
+    except KeyboardInterrupt:
+        pass
+    except writer.CannotUpdateFile as exc:
+        print(f"cannot mirror, {exc}  (use -f to overwrite it)")
+        return
+    if user_parms.reporting_level in (REPORTING_STANDARD, REPORTING_VERBOSE,):
+        print("stopped mirror to NeXus HDF5 file: " + nexus_output_file_name)
+
+
 def main():
     """entry point for command-line interface"""
 
@@ -192,11 +316,42 @@ def main():
             nexus_output_file_name = basename + user_parms.hdf5_extension
         else:
             nexus_output_file_name = user_parms.output_filename[0]
-        if user_parms.force_write or not os.path.exists(nexus_output_file_name):
-            out = writer.Writer(spec_data)
-            out.save(nexus_output_file_name, scan_list)
+        update = user_parms.update and os.path.exists(nexus_output_file_name)
+        follow = user_parms.mirror
+        if user_parms.force_write or update or follow or not os.path.exists(nexus_output_file_name):
+            out = writer.Writer(
+                spec_data,
+                compression=user_parms.compression,
+                compression_opts=user_parms.compression_opts,
+                shuffle=user_parms.shuffle,
+                min_size=user_parms.min_size,
+                narrow=user_parms.narrow,
+            )
+            if follow:
+                mirror(out, nexus_output_file_name, user_parms)
+                continue
+            try:
+                written = out.save(
+                    nexus_output_file_name,
+                    scan_list,
+                    processes=user_parms.processes,
+                    update=update,
+                )
+            except writer.CannotUpdateFile as exc:
+                if not user_parms.force_write:
+                    print(f"cannot update, {exc}  (use -f to overwrite it)")
+                    continue
+                update = False
+                written = out.save(
+                    nexus_output_file_name, scan_list, processes=user_parms.processes
+                )
+            if user_parms.reporting_level in (REPORTING_VERBOSE):
+                print("  wrote scan number(s): " + ", ".join(map(str, written)))
             if user_parms.reporting_level in (REPORTING_STANDARD, REPORTING_VERBOSE,):
-                print("wrote NeXus HDF5 file: " + nexus_output_file_name)
+                if update:
+                    print("updated NeXus HDF5 file: " + nexus_output_file_name)
+                else:
+                    print("wrote NeXus HDF5 file: " + nexus_output_file_name)
 
 
 if __name__ == "__main__":
@@ -17,12 +17,13 @@ REGISTRATION SUPPORT (internal use only)
 # see: http://stackoverflow.com/questions/14510286/plugin-architecture-plugin-manager-vs-inspecting-from-plugins-import
 """
 
-import importlib
+import importlib.util
 import pathlib
 import re
 import sys
 
 UNDEFINED_KEY = object()
+installed_plugin_files = []  # plugin files in order of installation
 
 
 class DuplicateKeyError(KeyError):
@@ -45,6 +46,7 @@ def install_user_plugin(plugin_file):
     module = importlib.util.module_from_spec(spec)
     sys.modules[plugin.stem] = module
     spec.loader.exec_module(module)
+    installed_plugin_files.append(str(plugin))
 
 
 class PluginMounter(type):
@@ -1 +1,36 @@
-"""Supplied SPEC Control Line handling plugins."""
+"""
+Supplied SPEC Control Line handling plugins.
+
+Plugin files listed in ``MANIFEST`` are imported only when a control
+line matching one of their keys is first found (or when all the known
+keys are requested).  Each entry describes the plugins in one file:
+
+* ``keys``: the ``key`` of each plugin (as written in the plugin)
+* ``scan_attributes``: the ``scan_attributes_defined`` by the plugins
+
+Other plugin files are imported with the control line registry.
+A plugin with its own ``match_key()`` method cannot be listed.
+"""
+
+MANIFEST = {
+    "apstools_specwriter": dict(
+        keys=[r"#MD\w*"],
+        scan_attributes=["MD"],
+    ),
+    "uim": dict(
+        keys=[r"#UIM\w*"],
+        scan_attributes=["UIM"],
+    ),
+    "unicat": dict(
+        keys=[r"#H\d+", r"#V\d+"],
+        scan_attributes=["H", "V", "metadata"],
+    ),
+    "uxml": dict(
+        keys=["#UXML"],
+        scan_attributes=["UXML", "UXML_root"],
+    ),
+    "XPCS": dict(
+        keys=[r"#VA\d+", r"#VD\d+", r"#VE\d+", "#XPCS", "#CCD"],
+        scan_attributes=["VA", "VD", "VE", "XPCS", "CCD"],
+    ),
+}
@@ -12,6 +12,8 @@ SPEC data file standard control lines
 from collections import OrderedDict
 import datetime
 import logging
+import numpy
+import re
 import time
 import warnings
 
@@ -22,6 +24,7 @@ from spec2nexus.diffractometers import LatticeParameters3D
 from spec2nexus.eznx import write_dataset, makeGroup, openGroup, makeLink
 from spec2nexus.scanf import scanf
 from spec2nexus.spec import (
+    SpecDataFile,
     SpecDataFileHeader,
     SpecDataFileScan,
     DuplicateSpecScanNumber,
@@ -38,6 +41,7 @@ from spec2nexus.writer import CONTAINER_CLASS
 
 logger = logging.getLogger(__name__)
 SCAN_DATA_KEY = "scan_data"
+HEADER_POSITIONERS = re.compile(r"^#P\d+ ", re.MULTILINE)  # in a header block
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
@@ -92,10 +96,8 @@ class SPEC_Epoch(ControlLineBase):
     # do NOT add E to scan_attributes_defined
 
     def process(self, buf, sdf_object, *args, **kws):
-        matches = [
-            h for h in sdf_object.headers if h.raw.strip() == buf.strip()
-        ]
-        if len(matches) > 0:
+        texts = sdf_object._get_header_texts_()
+        if buf.strip() in texts:
             # this header exists, nothing to do
             return
         header = SpecDataFileHeader(buf, parent=sdf_object)
@@ -105,7 +107,12 @@ class SPEC_Epoch(ControlLineBase):
         else:
             header.epoch = int(strip_first_word(line))
         sdf_object.headers.append(header)
-        header.interpret()  # parse the full header
+        texts.add(buf.strip())
+        if HEADER_POSITIONERS.search(buf) is not None:
+            # #P lines add to the latest scan:  interpret now, in file order
+            header.interpret()
+        else:
+            header._interpret_date_()  # the rest is interpreted when needed
 
 
 class SPEC_Date(ControlLineBase):
@@ -239,39 +246,30 @@ class SPEC_Scan(ControlLineBase):
         else:
             header = sdf.headers[-1]  # pick the most recent header
 
-        matches = [
-            (k, s)
-            for k, s in sdf.scans.items()
-            if s.raw.strip() == part.strip()
-        ]
-
-        if len(matches) > 0 and sdf.last_scan is not None:
-            if sdf.getScan(sdf.last_scan).raw != part:
-                return
+        hashes = None
+        if sdf.last_scan is None:
+            sdf._scan_hashes = None  # rebuilt when needed
+        else:
+            # Only compare with existing scans when refreshing.
+            hashes = sdf._get_scan_hashes_()
+            text = part.strip()
+            match = hashes.get(hash(text))
+            if match is not None and sdf.scans[match].raw.strip() == text:
+                # this scan exists
+                if sdf.getScan(sdf.last_scan).raw != part:
+                    return
 
         scan = SpecDataFileScan(header, part, parent=sdf)
         if sdf.last_scan is not None:
             # We know that `part` does not match any existing scan.
             # Do the first few lines match (#S and #D in particular)?
             # If so, then that scan has been updated with more data.
-            def beginning(buf):
-                "return a string with first few lines of buf"
-                return "\n".join(
-                    [
-                        line
-                        for line in buf.strip().splitlines()[:5]
-                        if line.startswith("#")
-                    ]
-                )
-
-            # TODO: replace beginning() with new algorithm
-            # if new_scan.raw.startswith(last_scan.raw), that's it!
-
-            if beginning(part) == beginning(
-                sdf.getScan(sdf.last_scan).raw
-            ):
+            if beginning(part) == beginning(sdf.getScan(sdf.last_scan).raw):
                 # remove the last scan
                 del sdf.scans[sdf.last_scan]
+                sdf._unindex_scan_(sdf.last_scan)
+                hashes = {k: v for k, v in hashes.items() if v != sdf.last_scan}
+                sdf._scan_hashes = hashes
                 sdf.last_scan = None
 
         scan.S = strip_first_word(part.splitlines()[0].strip())
@@ -296,6 +294,42 @@ class SPEC_Scan(ControlLineBase):
             msg = str(scan.scanNum) + " in " + sdf.fileName
             raise DuplicateSpecScanNumber(msg)
         sdf.scans[scan.scanNum] = scan
+        if hashes is not None:
+            hashes[hash(text)] = scan.scanNum
+
+
+def interned_labels(sdf_object, text, split=split_column_labels):
+    """
+    return the list of labels in text (from a header or a scan)
+
+    The labels are interned in a table kept by the data file, if any.
+    """
+    sdf = getattr(sdf_object, "parent", None)
+    if isinstance(sdf, SpecDataFile):
+        return sdf._interned_labels_(text, split)
+    return split(text)
+
+
+def beginning(buf, nlines=5):
+    """
+    return a string with the first few control lines of buf
+
+    Only the first ``nlines`` lines of buf are examined
+    (not the whole buffer, which might be very long).
+    """
+    text = buf.lstrip()
+    lines = []
+    start = 0
+    while len(lines) < nlines:
+        end = text.find("\n", start)
+        if end < 0:
+            lines.append(text[start:])
+            break
+        lines.append(text[start:end])
+        start = end + 1
+    return "\n".join(
+        [line.rstrip() for line in lines if line.startswith("#")]
+    )
 
 
 class SPEC_Geometry(ControlLineBase):
@@ -520,7 +554,7 @@ class SPEC_CounterNames(ControlLineBase):
     def process(self, text, header, *args, **kws):
         if not hasattr(header, "J"):
             header.J = []
-        header.J.append(strip_first_word(text).split())
+        header.J.append(interned_labels(header, strip_first_word(text), str.split))
         header.addPostProcessor(
             "counter cross-referencing", self.postprocess
         )
@@ -572,7 +606,7 @@ class SPEC_CounterMnemonics(ControlLineBase):
     def process(self, text, header, *args, **kws):
         if not hasattr(header, "j"):
             header.j = []
-        header.j.append(strip_first_word(text).split())
+        header.j.append(interned_labels(header, strip_first_word(text), str.split))
         header.addPostProcessor(
             "counter cross-referencing", self.postprocess
         )
@@ -635,15 +669,15 @@ class SPEC_Labels(ControlLineBase):
 
     def process(self, text, scan, *args, **kws):
         # Some folks use more than two spaces!  Use regular expression(re) module
-        scan.L = split_column_labels(strip_first_word(text))
+        scan.L = interned_labels(scan, strip_first_word(text))
 
         if len(scan.L) == 1 and hasattr(scan, "N") and scan.N[0] > 1:
             # BUT: some folks only use a single-space as a separator!
             # perhaps #L was written with single-space separators.?
             # Unusual for scan to have only 1 column, but possible
-            labels = strip_first_word(text).split()
-            if len(labels) == scan.N[0]:
-                scan.L = labels
+            single = interned_labels(scan, strip_first_word(text), str.split)
+            if len(single) == scan.N[0]:
+                scan.L = single
 
         scan.column_first = scan.L[0]
         scan.column_last = scan.L[-1]
@@ -736,6 +770,8 @@ class SPEC_PositionerNames(ControlLineBase):
     def process(self, text, sdf_object, *args, **kws):
         if isinstance(sdf_object, SpecDataFileScan):
             sdf_object = sdf_object.header
+            # interpret the header first or it would replace these names later
+            sdf_object.interpret()
         key = text.split()[0]
         if key == "#O0":
             sdf_object.O = []  # TODO: What if motor names are different?
@@ -743,7 +779,7 @@ class SPEC_PositionerNames(ControlLineBase):
         if content == "":
             content = []
         else:
-            content = split_column_labels(content)
+            content = interned_labels(sdf_object, content)
         sdf_object.O.append(content)
 
 
@@ -774,7 +810,7 @@ class SPEC_PositionerMnemonics(ControlLineBase):
         if content == "":
             content = []
         else:
-            content = content.split()
+            content = interned_labels(header, content, str.split)
         header.o.append(content)
         header.addPostProcessor(
             "positioner cross-referencing", self.postprocess
@@ -1161,6 +1197,11 @@ class SPEC_DataLine(ControlLineBase):
         """
         Easier to try conversion to number than construct complicated regexp
         """
+        first = text.lstrip()[:1]
+        if len(first) == 0:
+            return False
+        if not first.isdecimal() and first not in "+-.iInN":
+            return False  # quick test: cannot be a number (nor inf nor nan)
         try:
             float(text.strip().split()[0])
             return True
@@ -1542,20 +1583,20 @@ def combine_split_NM_lines(nm, data_lines):
         return data_lines
     dl = []
     N, M = nm
-    buf = ""
+    parts = []  # pieces of the line being combined
+    count = 0  # number of values in parts
     for line in data_lines:
         if line.startswith("@A"):
-            if len(buf) > 0:
-                dl.append(buf)
-            buf = []
+            if len(parts) > 0:
+                dl.append(" ".join(parts))
+            parts, count = [], 0
             dl.append(line)
         else:
-            if len(buf) > 0 and buf[-1] != " ":
-                buf += " "  # ensure whitespace delimiter
-            buf += line
-            if len(buf.split()) == N:  # assumption here!
-                dl.append(buf)
-                buf = ""
+            parts.append(line)
+            count += len(line.split())
+            if count == N:  # assumption here!
+                dl.append(" ".join(parts))
+                parts, count = [], 0
 
     return dl
 
@@ -1609,35 +1650,127 @@ def data_lines_postprocessing(scan):
     data_lines = combine_split_NM_lines(scan.N, data_lines)
 
     # interpret the data lines from the body of the scan
+    rows = []
+    mca_lines = {}
     for values in data_lines:
         if values.startswith("@A"):
             # which MCA spectrum is THIS one?
-            parts = values.split()
-            if parts[0] == "@A":  # @A: mca
+            word = values.split(None, 1)[0]
+            if word == "@A":  # @A: mca
                 key = r"mca"
             else:
-                key = r"mca" + parts[0][2:]  # @A1: mca1, @A2: mca2, ...
-            if key not in scan.data[MCA_DATA_KEY]:
-                scan.data[MCA_DATA_KEY][key] = []
-            # accumulate this spectrum
-            if "." in values:
-                data_type = float
-            else:
-                data_type = int
-            mca_spectrum = list(map(data_type, parts[1:]))
-            scan.data[MCA_DATA_KEY][key].append(mca_spectrum)
+                key = r"mca" + word[2:]  # @A1: mca1, @A2: mca2, ...
+            mca_lines.setdefault(key, []).append(values)
         else:
-            try:
-                buf = scan._interpret_data_row(values)
-                if len(buf) == num_columns:
-                    # only keep complete rows
-                    for label, val in buf.items():
-                        scan.data[label].append(val)
-            except ValueError:
-                pass  # ignore bad data lines (could save it as such ...)
+            rows.append(values)
+
+    columnar = getattr(scan.parent, "columnar", False)
+    for key, lines in mca_lines.items():
+        spectra = decode_mca_spectra(lines)
+        if spectra is None:
+            # not all the same length: decode one spectrum at a time
+            spectra = list(map(decode_mca_spectrum, lines))
+        elif not columnar:
+            if spectra.dtype.kind == "f" and not all("." in v for v in lines):
+                # some spectra are int, others float
+                spectra = list(map(decode_mca_spectrum, lines))
+            else:
+                spectra = spectra.tolist()
+        scan.data[MCA_DATA_KEY][key] = spectra
+
+    # interpret all the rows of numbers at once
+    array = parse_data_rows(rows, num_columns)
+    if columnar:
+        array = numpy.asfortranarray(array)  # each column is contiguous
+        for col, label in enumerate(scan.L[:num_columns]):
+            scan.data[label] = array[:, col]  # view, not a copy
+    else:
+        for col, label in enumerate(scan.L[:num_columns]):
+            scan.data[label] = array[:, col].tolist()
     scan.addH5writer(SCAN_DATA_KEY, data_lines_writer)
 
 
+def decode_mca_spectrum(text):
+    """
+    decode one MCA spectrum (an ``@A`` line) into a list of numbers
+
+    Values are int unless the line has a decimal point.
+    """
+    if "." in text:
+        data_type = float
+    else:
+        data_type = int
+    return list(map(data_type, text.split()[1:]))
+
+
+def decode_mca_spectra(lines):
+    """
+    decode all the spectra (``@A`` lines) of one MCA into a 2-D array
+
+    The array, with shape ``(number of spectra, number of channels)``,
+    is allocated first, then filled one spectrum at a time.
+    Values are int unless any line has a decimal point.
+
+    :param [str] lines: ``@A`` lines (continued lines already joined)
+    :returns: array, or ``None`` if the spectra could not be decoded
+        this way (such as spectra with different numbers of channels)
+    """
+    if len(lines) == 0:
+        return None
+    if any("." in line for line in lines):
+        data_type = numpy.float64
+    else:
+        data_type = numpy.int64
+    num_channels = len(lines[0].split()) - 1
+    spectra = numpy.empty((len(lines), num_channels), dtype=data_type)
+    with warnings.catch_warnings():
+        # numpy warns when text has values that are not numbers
+        warnings.simplefilter("error", DeprecationWarning)
+        for row, line in enumerate(lines):
+            parts = line.split(None, 1)
+            if len(parts) != 2:
+                return None
+            try:
+                spectrum = numpy.fromstring(parts[1], dtype=data_type, sep=" ")
+            except (DeprecationWarning, ValueError):
+                return None
+            if len(spectrum) != num_channels:
+                return None
+            spectra[row] = spectrum
+    return spectra
+
+
+def parse_data_rows(rows, num_columns):
+    """
+    interpret rows of numbers (text), all at once, into a 2-D array
+
+    Only complete rows are kept.  Rows that do not have ``num_columns``
+    values, or have a value that is not a number, are ignored.
+
+    :param [str] rows: each row is a line of numbers separated by white space
+    :param int num_columns: number of values expected in each row
+    :returns: float array with shape ``(number of rows kept, num_columns)``
+    """
+    if len(rows) > 0 and num_columns > 0:
+        try:
+            array = numpy.loadtxt(rows, dtype=float, comments=None, ndmin=2)
+            if array.shape[1] == num_columns:
+                return array
+        except ValueError:
+            pass  # some rows are not complete, see below
+
+    # interpret one row at a time, keep only the complete rows
+    values = []
+    for row in rows:
+        try:
+            numbers = [float(text) for text in row.split()]
+        except ValueError:
+            continue  # ignore bad data lines (could save it as such ...)
+        if len(numbers) == num_columns:
+            values.append(numbers)
+    return numpy.array(values, dtype=float).reshape(len(values), num_columns)
+
+
 def data_lines_writer(h5parent, writer, scan, *args, **kws):
     """Describe how to store scan data in an HDF5 NeXus file"""
     desc = "SPEC scan data"
@@ -5,7 +5,6 @@
 #UXML: UXML structured metadata
 """
 
-from lxml import etree
 import logging
 import os
 
@@ -80,6 +79,8 @@ class UXML_metadata(ControlLineBase):
 
         :param SpecDataFileScan scan: data from a single SPEC scan
         """
+        from lxml import etree  # imported when first needed
+
         xml_text = "\n".join(scan.UXML)
         if UXML_PROVIDES_ROOT_TAG:
             root = etree.fromstring(xml_text)
@@ -19,6 +19,7 @@ care of all that is necessary to read and interpret the information.
 
     ~is_spec_file
     ~is_spec_file_with_header
+    ~iter_scans
     ~SpecDataFile
     ~SpecDataFileHeader
     ~SpecDataFileScan
@@ -111,14 +112,31 @@ Try to read a file that does not exist:
 
 """
 
+import bisect
 from collections import OrderedDict
+import contextlib
+import hashlib
+import itertools
+import json
+import logging
+import mmap
 import os
+import re
+import sys
 import time
+from .plugin_core import ControlLineBase
+from .utils import split_column_labels
 from .utils import split_scan_number_string
 
 
+logger = logging.getLogger(__name__)
+
 UNRECOGNIZED_KEY = "unrecognized_control_line"
 MCA_DATA_KEY = "_mca_"
+SECTION_CONTROL_KEYS = "#E #F #S".split()
+SIDECAR_SUFFIX = ".index.json"
+SIDECAR_VERSION = 1
+SNIFF_LIMIT = 4096  # bytes read by is_spec_file_with_header()
 
 
 class SpecDataFileNotFound(IOError):
@@ -141,33 +159,40 @@ class UnknownSpecFilePart(Exception):
     """unknown part in a single SPEC data file"""
 
 
-def is_spec_file(filename):
+def is_spec_file(filename, limit=None):
     """
     Report if a given file name is a SPEC data file.
 
     :param str filename: path/to/possible/spec/data.file
+    :param int limit: (optional) largest number of bytes to search
+        for a ``#S`` line (default: whole file)
 
-    *filename* is a SPEC file if it contains at least one #F or #S control line.
+    *filename* is a SPEC file if it starts with a SPEC header
+    (see :func:`is_spec_file_with_header`) or contains at least
+    one #S control line.  The file is searched (memory-mapped)
+    only until the first #S line is found.
     """
     if not os.path.exists(filename) or not os.path.isfile(filename):
         return False
     if is_spec_file_with_header(filename):
         return True
     try:
-        with open(filename, "r") as fp:
-            for line in fp.readlines():
-                if line.startswith("#S "):
-                    return True
+        with _file_buffer(filename) as buf:
+            if b"\0" in buf[:SNIFF_LIMIT]:
+                return False  # binary file, not text
+            return _find_line_start(buf, b"#S ", limit) >= 0
     except Exception:
         pass
     return False
 
 
-def is_spec_file_with_header(filename):
+def is_spec_file_with_header(filename, limit=SNIFF_LIMIT):
     """
     Report if a given file name is a SPEC data file.
 
     :param str filename: path/to/possible/spec/data.file
+    :param int limit: largest number of bytes to read
+        (default: ``SNIFF_LIMIT``, 4096)
 
     *filename* is a SPEC file only if the file starts [#]_
     with these control lines in order:
@@ -188,10 +213,12 @@ def is_spec_file_with_header(filename):
     """
     if not os.path.exists(filename) or not os.path.isfile(filename):
         return False
-    expected_controls = ("#F ", "#E ", "#D ", "#C ")
+    expected_controls = (b"#F ", b"#E ", b"#D ", b"#C ")
     try:
-        lines = open(filename).readlines()[: len(expected_controls)]
-    except UnicodeDecodeError:
+        with open(filename, "rb") as fp:
+            # only read the start of the file
+            lines = fp.read(limit).splitlines()[: len(expected_controls)]
+    except OSError:
         return False
     if len(lines) != len(expected_controls):
         return False
@@ -201,6 +228,109 @@ def is_spec_file_with_header(filename):
     return True
 
 
+def iter_scans(filename, interpret=True):
+    """
+    Generate each scan in a SPEC data file, one at a time, in file order.
+
+    :param str filename: path/to/spec/data.file
+    :param bool interpret: (default: ``True``)
+        When ``True``, each scan is interpreted before it is yielded.
+
+    For programs that use each scan once (such as conversion to
+    another format).  Unlike :class:`SpecDataFile`, no scan is kept
+    after the next scan is read, only its scan number (to name any
+    duplicate scan number as ``SpecDataFile`` does).  Only the most
+    recent header is kept.  Each scan refers to its own header (``scan.header``).
+    Memory used is bounded by the largest scan in the file.
+
+    EXAMPLE::
+
+        for scan in spec.iter_scans("data.spec"):
+            print(scan.scanNum, scan.scanCmd, len(scan.data_lines))
+    """
+    if not os.path.exists(filename):
+        raise SpecDataFileNotFound(f"file does not exist: {filename}")
+    if not is_spec_file(filename):
+        raise NotASpecDataFile(f"not a SPEC data file: {filename}")
+
+    sdf = SpecDataFile(None)
+    sdf.fileName = filename
+    sdf.specFile = filename  # replaced by a #F control line
+    previous = None
+    for section in sdf._file_sections_():
+        for entry in sdf._process_sections_([section]):
+            if entry["key"] == "#E":
+                del sdf.headers[:-1]  # keep the most recent header
+            elif entry["key"] == "#S":
+                if previous is not None:
+                    sdf.scans[previous] = None  # keep only the scan number
+                key = previous = entry["scan"]
+                scan = sdf.scans[key]
+                if interpret:
+                    scan.interpret()
+                yield scan
+
+
+_SECTION_KEY = re.compile(rb"#[EFS](?=[ \t\n\r\x0b\x0c]|\Z)")
+
+
+@contextlib.contextmanager
+def _file_buffer(filename):
+    """
+    (internal) Context: the content of a file as a read-only bytes-like object.
+
+    The file is memory-mapped (not read) when possible.
+    """
+    with open(filename, "rb") as fp:
+        try:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            buf = fp.read()  # empty file, or cannot be memory-mapped
+        try:
+            yield buf
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+
+def _section_starts(buf, start=0):
+    """
+    (internal) Byte offsets of the lines (from ``start``) that start a #E, #F, or #S section.
+
+    ``buf`` is bytes-like, such as a memory-mapped file, and is not copied.
+    Each control key is found with a bytes search, then accepted if
+    only white space precedes it on its line.  EOL may be any of
+    ``\\n``, ``\\r\\n``, or ``\\r``.  ``start`` must be the start of a line.
+    """
+    starts = []
+    for offset in map(re.Match.start, _SECTION_KEY.finditer(buf, start)):
+        if offset > start and buf[offset - 1] not in b"\n\r":
+            while offset > start and buf[offset - 1] in b" \t":
+                offset -= 1  # indented control line
+            if offset > start and buf[offset - 1] not in b"\n\r":
+                continue  # not at the start of a line
+        starts.append(offset)
+    return starts
+
+
+def _find_line_start(buf, text, limit=None):
+    """
+    (internal) Offset of the first line (in bytes-like ``buf``) that starts with ``text``.
+
+    Search no further than ``limit`` bytes.  Return -1 if not found.
+    """
+    end = len(buf) if limit is None else min(limit, len(buf))
+    offset = buf.find(text, 0, end)
+    while offset > 0 and buf[offset - 1] not in b"\n\r":
+        offset = buf.find(text, offset + 1, end)
+    return offset
+
+
+def _decode_section(buf):
+    """(internal) Text of a section (bytes): EOL is "\\n", no final EOL."""
+    return "\n".join(bytes(buf).decode(errors="replace").splitlines())
+
+
 # -------------------------------------------------------------------------------------------
 
 
@@ -209,11 +339,31 @@ class SpecDataFile(object):
     """
     contents of a SPEC data file
 
+    :param str filename: path/to/spec/data.file
+    :param bool indexed: (default: ``False``)
+        When ``True``, only the byte offset and length of each scan
+        is kept in memory.  The text of a scan (its ``raw`` attribute)
+        is read from the file when it is needed.
+        Use this for very large data files.
+    :param sidecar: (default: ``None``)
+        Name of a sidecar index file, to re-open an unchanged data file
+        quickly.  If ``True``, the name is the data file name with
+        ``.index.json`` appended.  The index file is written after the data
+        file is read.  It is used (instead of reading the data file again)
+        when the size and modification time of the data file have not
+        changed.  Using a sidecar implies ``indexed=True``.
+    :param bool columnar: (default: ``False``)
+        When ``True``, each column of scan data (``scan.data[label]``)
+        is a NumPy array (instead of a list of numbers).  Each
+        set of MCA spectra is a 2-D NumPy array.
+
     .. autosummary::
 
         ~dissect_file
+        ~index_file
         ~getFirstScanNumber
         ~getLastScanNumber
+        ~getLatestScan
         ~getMaxScanNumber
         ~getMinScanNumber
         ~getScan
@@ -232,7 +382,7 @@ class SpecDataFile(object):
     scans = {}
     readOK = -1
 
-    def __init__(self, filename):
+    def __init__(self, filename, indexed=False, sidecar=None, columnar=False):
         self.fileName = None
         self.headers = []
         self.scans = OrderedDict()
@@ -240,6 +390,16 @@ class SpecDataFile(object):
         self.last_scan = None
         self.mtime = 0
         self.filesize = 0
+        self.indexed = indexed or bool(sidecar)
+        self.columnar = columnar
+        self.sidecar = None
+        self._section_index_ = []
+        self._tail_ = None  # see _remember_tail_()
+        self._scan_hashes = None  # see _get_scan_hashes_()
+        self._header_texts = None  # see _get_header_texts_()
+        self._header_cache_ = {}  # see SpecDataFileHeader.interpret()
+        self._label_table_ = {}  # see _interned_labels_()
+        self._reset_scan_index_()
 
         if filename is not None:
             if not os.path.exists(filename):
@@ -247,6 +407,10 @@ class SpecDataFile(object):
             if not is_spec_file(filename):
                 raise NotASpecDataFile(f"not a SPEC data file: {filename}")
             self.fileName = filename
+            if sidecar is True:
+                self.sidecar = str(filename) + SIDECAR_SUFFIX
+            elif sidecar:
+                self.sidecar = str(sidecar)
 
             self.read()
 
@@ -257,9 +421,9 @@ class SpecDataFile(object):
         """Slicing interface: sliced access to SPEC scan list."""
         if isinstance(given, slice):
             # print(f"slice: {given.start=} {given.stop=} {given.step=}")
-            scanlist = self.getScanNumbersChronological()
-            start = float(given.start or scanlist[0])
-            stop = float(given.stop or scanlist[-1])
+            chronology = self._chronological_index_()
+            start = float(given.start or chronology[0][2])
+            stop = float(given.stop or chronology[-1][2])
             # print(f"adjusted: {start=} {stop=}")
             if (  # relative positions
                 (given.start is None and (given.stop is None or given.stop < 0))
@@ -267,10 +431,10 @@ class SpecDataFile(object):
                 or (start < 0 and stop < 0)
             ):
 
-                keys = scanlist[given.start : given.stop]
+                keys = [entry[2] for entry in chronology[given.start : given.stop]]
             elif start >= 0 and stop >= 0:
                 # range of absolute scan numbers
-                keys = [k for k in scanlist if start <= float(k) < stop]
+                keys = self._scan_number_range_(start, stop)
             else:
                 raise IndexError(
                     f"slice start and stop must have same sign: given='{given}'"
@@ -280,7 +444,7 @@ class SpecDataFile(object):
                 if step < 0:  # relative choice
                     kd = {}  # create a dictionary for selections
                     for k in keys:
-                        s, w = split_scan_number_string(k)
+                        s, w = self._scan_entries_[k][1][0]  # (scan, repeat)
                         # look for multiple occurrences
                         if w == 0:  # first scan s in file
                             kd[str(s)] = [k]
@@ -290,7 +454,7 @@ class SpecDataFile(object):
                     # relative or absolute, same indexing _here_
                     keys = [kd[str(k)][step] for k in kd.keys()]
                 else:  # absolute choice
-                    keys = [k for k in keys if split_scan_number_string(k)[1] == step]
+                    keys = [k for k in keys if self._scan_entries_[k][1][0][1] == step]
             return [self.getScan(k) for k in keys]
         elif isinstance(given, tuple):
             # print(f"mutiple: {given=}")
@@ -310,8 +474,21 @@ class SpecDataFile(object):
                 return self.getScan(given)
             else:
                 # relative position in the list
-                scanlist = self.getScanNumbersChronological()
-                return self.getScan(scanlist[given])
+                return self.getScan(self._chronological_index_()[given][2])
+
+    def _scan_number_range_(self, start, stop):
+        """(internal) Scan numbers from ``start`` up to (not including) ``stop``, by date."""
+        numbering = self._numerical_index_()
+        if float(start).is_integer() and float(stop).is_integer():
+            # (scan, repeat) is in range when scan is in range
+            first = bisect.bisect_left(numbering, ((int(start),),))
+            last = bisect.bisect_left(numbering, ((int(stop),),))
+            entries = numbering[first:last]
+        else:
+            entries = [e for e in numbering if start <= float(e[2]) < stop]
+        # same order as the other selections: by date
+        keys = [entry[2] for entry in entries]
+        return sorted(keys, key=lambda key: self._scan_entries_[key][0])
 
     @property
     def update_available(self):
@@ -351,6 +528,15 @@ class SpecDataFile(object):
 
         returns previous last_scan or None if file not updated
 
+        Only the new content of the file is parsed.  Parsing resumes
+        at the start of the last section (usually the last scan),
+        since that section may not have been complete before.
+        If the file has been truncated or rewritten,
+        the whole file is read again.
+        If the new content cannot be parsed (such as a line
+        SPEC has not finished writing), the exception is raised
+        and the content is unchanged until the next call.
+
         .. caution:  previous last_scan must be re-created if updated
 
            After calling :meth:`refresh()`, any client
@@ -368,36 +554,19 @@ class SpecDataFile(object):
         if self.update_available:
             previous_scan = self.last_scan
 
-            self.read()
+            if not self._read_appended_():
+                # file was truncated or rewritten: start over
+                self.headers = []
+                self.scans = OrderedDict()
+                self._scan_hashes = None
+                self._header_texts = None
+                self._reset_scan_index_()
+                self.last_scan = None
+                self.__dict__.pop("specFile", None)
+                self.read()
             return previous_scan
         return None
 
-    def _read_file_(self, spec_file_name):
-        """Reads a spec data file"""
-        if not os.path.exists(spec_file_name):
-            raise SpecDataFileNotFound(f"file does not exist: {spec_file_name}")
-
-        try:
-            with open(spec_file_name, "r") as fp:
-                buf = fp.read()
-
-            scan_found = False
-            for line in buf.splitlines():
-                if line.startswith("#S "):
-                    scan_found = True
-                    break
-            if not scan_found and not is_spec_file_with_header(spec_file_name):
-                raise NotASpecDataFile(f"Not a spec data file: {spec_file_name}")
-        except IOError:
-            raise SpecDataFileCouldNotOpen(
-                f"Could not open spec file: {spec_file_name}"
-            )
-
-        # caution: some files may have EOL = \r\n
-        # convert all '\r\n' to '\n', then all '\r' to '\n'
-
-        return buf.replace("\r\n", "\n").replace("\r", "\n")
-
     def dissect_file(self):
         """
         divide (SPEC data file text) buffer into sections
@@ -411,126 +580,462 @@ class SpecDataFile(object):
             text with one of the above control lines at its start
 
         """
-        SECTION_CONTROL_KEYS = "#E #F #S".split()
+        return [block for block, _location in self._file_sections_()]
 
-        file_lines = self._read_file_(self.fileName).splitlines()
+    def index_file(self):
+        """
+        find the location of each section in the file, without reading its text
 
-        def is_section_start(text):
-            if len(text.strip()) == 0:
-                return False
-            f = text.split()[0]
-            if len(f) != 2:
-                return False
-            return f in SECTION_CONTROL_KEYS
+        internal: A *section* starts with either #F | #E | #S
+
+        The file is scanned once.  The text of a section can be read
+        later, as needed, with ``_read_section_(offset, length)``.
+
+        RETURNS
+
+        [(offset, length)]
+            list of sections where each section is given by its
+            byte offset from the start of the file and its length
+            (in bytes)
+
+        """
+        if not os.path.exists(self.fileName):
+            raise SpecDataFileNotFound(f"file does not exist: {self.fileName}")
+
+        try:
+            with _file_buffer(self.fileName) as buf:
+                boundaries = _section_starts(buf)
+                file_size = len(buf)
+        except IOError:
+            raise SpecDataFileCouldNotOpen(
+                f"Could not open spec file: {self.fileName}"
+            )
 
-        boundaries = [
-            _line_num
-            for _line_num, text in enumerate(file_lines)
-            if is_section_start(text)
-        ]
         if len(boundaries) == 0:
             raise NotASpecDataFile(
                 f"None of these SPEC control keys ({SECTION_CONTROL_KEYS})"
                 f" found in file: {self.fileName}"
             )
         # last section goes all the way to the end
-        boundaries.append(len(file_lines))
+        boundaries.append(file_size)
 
-        sections = [
-            "\n".join(file_lines[start:finish])
+        return [
+            (start, finish - start)
             for start, finish in zip(boundaries[:-1], boundaries[1:])
         ]
 
-        return sections
+    def _read_section_(self, offset, length):
+        """(internal) Read the text of one section from the file."""
+        with open(self.fileName, "rb") as fp:
+            fp.seek(offset)
+            buf = fp.read(length)
+        return _decode_section(buf)
 
-    def read(self):
-        """Reads and parses a spec data file"""
+    def _indexed_sections_(self):
+        """(internal) Generate (block, location) for each section, read one at a time."""
+        for location in self.index_file():
+            yield self._read_section_(*location), location
+
+    def _file_sections_(self, start=0):
+        """
+        (internal) Generate (block, location) for each section, from byte ``start``.
+
+        The file is memory-mapped.  Only the sections requested
+        (as the generator is consumed) are decoded.
+        """
+        if not os.path.exists(self.fileName):
+            raise SpecDataFileNotFound(f"file does not exist: {self.fileName}")
+
+        try:
+            with _file_buffer(self.fileName) as buf:
+                boundaries = _section_starts(buf, start)
+                if len(boundaries) == 0 and start == 0:
+                    raise NotASpecDataFile(
+                        f"None of these SPEC control keys ({SECTION_CONTROL_KEYS})"
+                        f" found in file: {self.fileName}"
+                    )
+                # last section goes all the way to the end
+                boundaries.append(len(buf))
+
+                for begin, finish in zip(boundaries[:-1], boundaries[1:]):
+                    location = (begin, finish - begin)
+                    yield _decode_section(buf[begin:finish]), location
+        except IOError:
+            raise SpecDataFileCouldNotOpen(
+                f"Could not open spec file: {self.fileName}"
+            )
+
+    def _sidecar_sections_(self, sections):
+        """
+        (internal) Generate (block, location) for each section in the sidecar index.
+
+        Header sections are read from the data file.  For a scan, the block
+        is just its ``#S`` and ``#D`` lines, from the index.
+        """
+        for entry in sections:
+            location = (entry["offset"], entry["length"])
+            if entry["key"] == "#S":
+                lines = [entry["S"]]
+                if "D" in entry:
+                    lines.append(entry["D"])
+                yield "\n".join(lines), location
+            else:
+                yield self._read_section_(*location), location
+
+    def _load_sidecar_(self):
+        """(internal) Return sections from the sidecar index, None if not valid."""
+        if self.sidecar is None or len(self.scans) > 0:
+            return None
+        try:
+            with open(self.sidecar, "r") as fp:
+                index = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get("version") != SIDECAR_VERSION:
+            return None
+        # same fields as update_available
+        if index.get("size") != os.path.getsize(self.fileName):
+            return None
+        if index.get("mtime") != os.path.getmtime(self.fileName):
+            return None
+        return index.get("sections")
+
+    def _save_sidecar_(self, sections, size, mtime):
+        """(internal) Write the sidecar index file."""
+        index = dict(
+            version=SIDECAR_VERSION,
+            file=os.path.basename(self.fileName),
+            size=size,
+            mtime=mtime,
+            sections=sections,
+        )
+        temporary = self.sidecar + ".tmp"
+        try:
+            with open(temporary, "w") as fp:
+                json.dump(index, fp)
+            os.replace(temporary, self.sidecar)
+        except OSError as exc:
+            logger.warning("Could not write index file %s: %s", self.sidecar, exc)
+
+    def _process_sections_(self, sections):
+        """
+        (internal) Parse each (block, location) section.
+
+        Returns a list with an index entry for each section parsed.
+        """
         from .control_lines import control_line_registry
 
-        sections = self.dissect_file()
-        for block in sections:
+        section_index = []
+        for block, location in sections:
             if len(block) == 0:
                 continue
-            key = control_line_registry.get_control_key(block.splitlines()[0])
+            first_line = block.splitlines()[0]
+            key = control_line_registry.get_control_key(first_line)
             if not key.startswith("#"):
                 continue  # cannot process this block, skip silently
             control_line_registry.process(key, block, self)
+            entry = dict(key=key)
 
             if key == "#S":
-                scan = list(self.scans.values())[-1]
+                entry["S"] = first_line
+                scan = self.getLatestScan()
+                entry["scan"] = scan.scanNum
                 for line in scan.raw.splitlines()[1:]:
                     if len(line) > 0:
                         key = line.split()[0]
                         if key in ("#D",):
+                            entry["D"] = line
                             control_line_registry.process(key, line, scan)
                             break
+                if self.indexed and location is not None and scan.raw is block:
+                    # Keep only the location, read the text when needed.
+                    scan.set_raw_location(*location)
+                self._index_scan_(scan)
+
+            if location is not None:
+                entry["offset"], entry["length"] = location
+                section_index.append(entry)
+        return section_index
+
+    def _get_scan_hashes_(self):
+        """
+        (internal) dict of scan numbers, keyed by hash of the (stripped) scan text
+
+        Used to recognize a scan that has already been read.
+        Built when first needed, then kept up to date by the ``#S`` plugin.
+        """
+        if self._scan_hashes is None:
+            self._scan_hashes = {
+                hash(scan.raw.strip()): key for key, scan in self.scans.items()
+            }
+        return self._scan_hashes
+
+    def _reset_scan_index_(self):
+        """(internal) Start a new (empty) index of the scans."""
+        self._chronology_ = []  # sorted: (epoch, order, scan number)
+        self._numbering_ = []  # sorted: ((scan, repeat), order, scan number)
+        self._scan_entries_ = {}  # (chronology, numbering) entries, by scan number
+        self._scan_order_ = itertools.count()  # order in which scans were read
+
+    def _index_scan_(self, scan):
+        """
+        (internal) Add a scan (just read) to the index of scans.
+
+        The index is kept sorted two ways:
+
+        * by date (using the epoch from the ``#D`` line, parsed as the
+          scan is read) so chronological queries need not parse any dates.
+        * by scan number, as ``(scan, repeat)`` (such as ``(1, 1)``
+          for scan ``1.1``) for selections by scan number.
 
+        Scans with the same date (or number) are in the order read.
+        A scan already in the index is not added again.
+        """
+        if scan.scanNum in self._scan_entries_:
+            return
+        order = next(self._scan_order_)
+        epoch = getattr(scan, "epoch", None)
+        if epoch is None:
+            # not sortable, kept at the end
+            by_date = (float("inf"), order, scan.scanNum, scan.date)
+        else:
+            by_date = (epoch, order, scan.scanNum)
+        try:
+            by_number = (split_scan_number_string(scan.scanNum), order, scan.scanNum)
+        except ValueError:
+            # not sortable, kept at the end
+            by_number = ((float("inf"),), order, scan.scanNum)
+        bisect.insort(self._chronology_, by_date)
+        bisect.insort(self._numbering_, by_number)
+        self._scan_entries_[scan.scanNum] = (by_date, by_number)
+
+    def _chronological_index_(self):
+        """(internal) The scans, sorted by date: [(epoch, order, scan number)]."""
+        chronology = self._chronology_
+        if len(chronology) > 0 and chronology[-1][0] == float("inf"):
+            # a scan without a date: same exception as parsing its date
+            time.strptime(chronology[-1][3])
+        return chronology
+
+    def _numerical_index_(self):
+        """(internal) The scans, sorted by number: [((scan, repeat), order, scan number)]."""
+        numbering = self._numbering_
+        if len(numbering) > 0 and numbering[-1][0] == (float("inf"),):
+            # not a scan number: same exception as converting it to a number
+            float(numbering[-1][2])
+        return numbering
+
+    def _unindex_scan_(self, scan_number):
+        """(internal) Remove a scan from the index of scans."""
+        entries = self._scan_entries_.pop(scan_number, None)
+        if entries is not None:
+            for index, entry in zip((self._chronology_, self._numbering_), entries):
+                del index[bisect.bisect_left(index, entry)]
+
+    def _get_header_texts_(self):
+        """
+        (internal) set of the (stripped) text of each header
+
+        Used to recognize a header that has already been read.
+        Built when first needed, then kept up to date by the ``#E`` plugin.
+        """
+        if self._header_texts is None:
+            self._header_texts = {header.raw.strip() for header in self.headers}
+        return self._header_texts
+
+    def _interned_labels_(self, text, split=split_column_labels):
+        """
+        (internal) list of the labels in ``text``, split by ``split(text)``
+
+        The same few label lines (``#L``, ``#O``, ...) are repeated in
+        every scan or header of a file.  Each is split only once and
+        all lists from it share the same label strings.
+        A new list is returned each time (a scan may rename its labels).
+        """
+        key = (split, text)
+        labels = self._label_table_.get(key)
+        if labels is None:
+            labels = tuple(map(sys.intern, split(text)))
+            self._label_table_[key] = labels
+        return list(labels)
+
+    def _remember_tail_(self):
+        """
+        (internal) Remember where the last section starts, to resume reading there.
+
+        A digest of the last section's bytes is kept to recognize
+        when the file has been truncated or rewritten.
+        """
+        self._tail_ = None
+        if len(self._section_index_) == 0:
+            return
+        entry = self._section_index_[-1]
+        with open(self.fileName, "rb") as fp:
+            fp.seek(entry["offset"])
+            buf = fp.read(entry["length"])
+        self._tail_ = dict(
+            entry=entry,
+            digest=hashlib.sha1(buf).hexdigest(),
+            header=self.headers[-1] if len(self.headers) > 0 else None,
+        )
+
+    def _read_appended_(self):
+        """
+        (internal) Parse only the sections appended since the last read.
+
+        The last section is parsed again since it might not have been
+        complete.  Returns ``False`` (and parses nothing) when the file
+        has been truncated or rewritten.  If the new content cannot be
+        parsed, the exception is raised and the content read before
+        is kept unchanged, to be read again by the next call.
+        """
+        if self._tail_ is None:
+            return False
+        filesize = os.path.getsize(self.fileName)
+        mtime = os.path.getmtime(self.fileName)
+        entry = self._tail_["entry"]
+        if filesize < entry["offset"] + entry["length"]:
+            return False  # truncated
+        with open(self.fileName, "rb") as fp:
+            fp.seek(entry["offset"])
+            buf = fp.read(entry["length"])
+        if hashlib.sha1(buf).hexdigest() != self._tail_["digest"]:
+            return False  # rewritten
+
+        # The appended text may be incomplete (SPEC is still writing it).
+        # If it cannot be parsed, restore the content read before.
+        saved = dict(
+            headers=list(self.headers),
+            scans=OrderedDict(self.scans),
+            last_scan=self.last_scan,
+            _chronology_=list(self._chronology_),
+            _numbering_=list(self._numbering_),
+            _scan_entries_=dict(self._scan_entries_),
+            _section_index_=self._section_index_,
+        )
+        try:
+            # remove what was parsed from the last section
+            if entry["key"] == "#S":
+                self.scans.pop(entry["scan"], None)
+                self._unindex_scan_(entry["scan"])
+            elif entry["key"] == "#E" and len(self.headers) > 0:
+                if self.headers[-1] is self._tail_["header"]:
+                    self.headers.pop()
+                    self._header_texts = None
+            self.last_scan = None  # no need to compare with existing scans
+
+            section_index = self._process_sections_(self._file_sections_(entry["offset"]))
+            self._section_index_ = self._section_index_[:-1] + section_index
+            self._finish_read_(filesize, mtime, True)
+        except Exception:
+            self.__dict__.update(saved)
+            self._scan_hashes = None  # rebuilt when needed
+            self._header_texts = None  # rebuilt when needed
+            raise
+        return True
+
+    def _finish_read_(self, filesize, mtime, save_sidecar):
+        """(internal) Bookkeeping after the file is read."""
         # fix any missing parts
         if not hasattr(self, "specFile"):
             self.specFile = self.fileName
 
         self.last_scan = self.getLastScanNumber()
-        self.filesize = os.path.getsize(self.fileName)
-        self.mtime = os.path.getmtime(self.fileName)
+        self._remember_tail_()
+        # Sizes from *before* reading: when the file grew while
+        # it was read, update_available will report it.
+        self.filesize = filesize
+        self.mtime = mtime
+
+        unchanged = (
+            os.path.getsize(self.fileName) == filesize
+            and os.path.getmtime(self.fileName) == mtime
+        )
+        if self.sidecar is not None and save_sidecar and unchanged:
+            self._save_sidecar_(self._section_index_, filesize, mtime)
+
+    def read(self):
+        """Reads and parses a spec data file"""
+        # the file might grow while it is read
+        filesize = os.path.getsize(self.fileName)
+        mtime = os.path.getmtime(self.fileName)
+
+        index = self._load_sidecar_()
+        if index is not None:
+            sections = self._sidecar_sections_(index)
+        elif self.indexed:
+            sections = self._indexed_sections_()
+        else:
+            sections = self._file_sections_()
+        self._section_index_ = self._process_sections_(sections)
+        self._finish_read_(filesize, mtime, index is None)
 
     def getScan(self, scan_number=0):
         """return the scan number indicated, None if not found"""
         if int(float(scan_number)) < 1:
             # relative scan reference
-            scanlist = self.getScanNumbers()
-            if len(scanlist) == 0:
+            numbering = self._numerical_index_()
+            if len(numbering) == 0:
                 return None
-            scan_number = list(scanlist)[int(scan_number)]
+            scan_number = numbering[int(scan_number)][2]
         scan_number = str(scan_number)
         if scan_number in self.scans:
             return self.scans[scan_number]
         return None
 
+    def getLatestScan(self):
+        """return the scan most recently read from the file, None if no scans"""
+        # scans are kept in the order read
+        return next(reversed(self.scans.values()), None)
+
     def getScanNumbers(self):
         """return a list of all scan numbers sorted by scan number"""
-        keys = self.scans.keys()
-        try:
-            r = sorted(keys, key=int)
-        except ValueError:
-            r = sorted(keys, key=float)
-        return r
+        return [entry[2] for entry in self._numerical_index_()]
 
-    def getScanNumbersChronological(self):
-        """return a list of all scan numbers sorted by date"""
+    def getScanNumbersChronological(self, start=None, stop=None):
+        """
+        return a list of all scan numbers sorted by date
 
-        def byDate_key(scan):
-            return time.strptime(scan.date)
+        :param float start: (optional) only scans dated at or after this epoch
+        :param float stop: (optional) only scans dated before this epoch
 
-        scans = sorted(self.scans.values(), key=byDate_key)
-        return [_.scanNum for _ in scans]
+        Dates are not parsed here:  the scans are kept in
+        chronological order as the file is read.
+        """
+        chronology = self._chronological_index_()
+        first = 0 if start is None else bisect.bisect_left(chronology, (start,))
+        last = len(chronology)
+        if stop is not None:
+            last = bisect.bisect_left(chronology, (stop,))
+        return [entry[2] for entry in chronology[first:last]]
 
     def getMinScanNumber(self):
         """return the lowest numbered scan"""
-        scans = self.getScanNumbers()
-        if len(scans) == 0:
+        numbering = self._numerical_index_()
+        if len(numbering) == 0:
             return 0
-        return scans[0]
+        return numbering[0][2]
 
     def getMaxScanNumber(self):
         """return the highest numbered scan"""
-        scans = self.getScanNumbers()
-        if len(scans) == 0:
+        numbering = self._numerical_index_()
+        if len(numbering) == 0:
             return 0
-        return scans[-1]
+        return numbering[-1][2]
 
     def getFirstScanNumber(self):
         """return the first scan"""
-        scans = self.getScanNumbersChronological()
-        if len(scans) == 0:
+        chronology = self._chronological_index_()
+        if len(chronology) == 0:
             return 0
-        return scans[0]
+        return chronology[0][2]
 
     def getLastScanNumber(self):
         """return the last scan"""
-        scans = self.getScanNumbersChronological()
-        if len(scans) == 0:
+        chronology = self._chronological_index_()
+        if len(chronology) == 0:
             return 0
-        return scans[-1]
+        return chronology[-1][2]
 
     def getScanCommands(self, scan_list=None):
         """return all the scan commands as a list, with scan number"""
@@ -550,6 +1055,10 @@ class SpecDataFileHeader(object):
     """
     contents of a spec data file header (#E) section
 
+    The header is interpreted on first use of an attribute defined
+    by its control lines (such as ``comments`` or ``O``), or by calling
+    :meth:`interpret`.  Only its date (``#D``) is interpreted as it is read.
+
     .. autosummary::
 
         ~interpret
@@ -562,26 +1071,74 @@ class SpecDataFileHeader(object):
     def __init__(self, buf, parent=None):
         # ----------- initialize the instance variables
         self.parent = parent  # instance of SpecDataFile
-        self.comments = []
         self.date = ""
         self.epoch = 0
         if parent is None:
             self.file = None
         else:
             self.file = parent.fileName
-        self.H = []
-        self.O = []
         self.raw = buf
-        self.postprocessors = {}
-        self.h5writers = {}
+        self._dated_ = False  # see _interpret_date_()
+        self._interpreted_ = False
+        # key (not the object, which might be released) of the latest scan
+        self._latest_scan_key_ = None if parent is None else next(reversed(parent.scans), None)
+        self._used_latest_scan_ = False
+
+    def __getattr__(self, name):
+        # Only called when ``name`` is not found:  interpret (once) and try again.
+        if name.startswith("__") or self.__dict__.get("_interpreted_", True):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        self.interpret()
+        return getattr(self, name)
+
+    def _interpret_date_(self):
+        """(internal) Interpret the #D line(s), apart from the rest of the header."""
+        from .control_lines import control_line_registry
+
+        if self._dated_:
+            return
+        self._dated_ = True
+        for line in self.raw.splitlines():
+            if line.startswith("#D "):
+                control_line_registry.process("#D", line, self)
 
     def interpret(self):
-        """Interpret the supplied buffer with the spec data file header."""
+        """
+        Interpret the supplied buffer with the spec data file header.
+
+        Headers with the same text (apart from their #E and #D lines,
+        which change each time SPEC starts a new header) in the same
+        file share the result:  it is interpreted only once.
+        """
         from .control_lines import control_line_registry
 
-        for _i, line in enumerate(self.raw.splitlines(), start=1):
-            if len(line) == 0:
-                continue  # ignore blank lines
+        if self._interpreted_:
+            return
+        self._interpreted_ = True
+        self._interpret_date_()
+
+        lines = [
+            line
+            for line in self.raw.splitlines()
+            if len(line) > 0 and not line.startswith(("#D ", "#E "))
+        ]
+        body = "\n".join(lines)
+        cache = getattr(self.parent, "_header_cache_", None)
+        if cache is not None and body in cache:
+            for name, value in cache[body].items():
+                setattr(self, name, _copy_containers(value))
+            return
+
+        self.comments = []
+        self.H = []
+        self.O = []
+        self.postprocessors = {}
+        self.h5writers = {}
+        per_header = set(self.__dict__)
+
+        for line in lines:
             key = control_line_registry.get_control_key(line)
             if key is None:
                 # log message instead of raise exception
@@ -589,8 +1146,6 @@ class SpecDataFileHeader(object):
                 # raise UnknownSpecFilePart("line %d: unknown header line: %s" % (_i, line))
                 key = UNRECOGNIZED_KEY
                 control_line_registry.process(key, line, self)
-            elif key == "#E":
-                pass  # avoid recursion
             else:
                 # most of the work is done here
                 control_line_registry.process(key, line, self)
@@ -599,6 +1154,16 @@ class SpecDataFileHeader(object):
         for func in self.postprocessors.values():
             func(self)
 
+        if cache is not None and not self._used_latest_scan_:
+            # Share this result (unless it changed a scan).
+            cache[body] = {
+                name: _copy_containers(value)
+                for name, value in self.__dict__.items()
+                if name not in per_header or name in self._shared_defaults_
+            }
+
+    _shared_defaults_ = "comments H O postprocessors h5writers".split()
+
     def addPostProcessor(self, label, func):
         """
         add a function to be processed after interpreting all lines from a header
@@ -624,12 +1189,61 @@ class SpecDataFileHeader(object):
             self.h5writers[label] = func
 
     def getLatestScan(self):
-        return list(self.parent.scans.values())[-1]
+        """return the scan most recently read from the file (before this header)"""
+        self._used_latest_scan_ = True
+        if self._latest_scan_key_ is None:
+            return None
+        return self.parent.scans.get(self._latest_scan_key_)
+
+
+def _copy_containers(value):
+    """(internal) copy of value with its (nested) dictionaries and lists, other objects are shared"""
+    if isinstance(value, dict):
+        value = value.copy()
+        for k, v in value.items():
+            value[k] = _copy_containers(v)
+    elif isinstance(value, list):
+        value = [_copy_containers(v) for v in value]
+    return value
 
 
 # -------------------------------------------------------------------------------------------
 
 
+class _LazyAttribute:
+    """
+    (internal) Scan attribute with a value only after the scan is interpreted.
+
+    The first use of the attribute calls ``scan.interpret()``.  The value
+    is kept in the scan's instance dictionary which Python searches
+    before this (non-data) descriptor, so it is not called again.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, scan, owner=None):
+        if scan is None:
+            return self
+        if scan.__lazy_interpret__:
+            scan.interpret()
+        try:
+            return scan.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(scan).__name__}' object has no attribute '{self.name}'"
+            ) from None
+
+
+def _install_lazy_attributes(cls):
+    """(internal) Add a descriptor to cls for each of the plugins' scan attributes."""
+    for attr in ControlLineBase.lazy_attributes:
+        if attr not in cls._lazy_installed:
+            if not hasattr(cls, attr):  # do not replace methods or properties
+                setattr(cls, attr, _LazyAttribute(attr))
+            cls._lazy_installed.append(attr)
+
+
 class SpecDataFileScan(object):
     """
     contents of a spec data file scan (#S) section
@@ -638,6 +1252,7 @@ class SpecDataFileScan(object):
 
         ~get_macro_name
         ~interpret
+        ~set_raw_location
         ~add_interpreter_comment
         ~get_interpreter_comments
         ~addPostProcessor
@@ -645,24 +1260,35 @@ class SpecDataFileScan(object):
 
     """
 
+    # default values of (some) lazy attributes, set by interpret()
+    _lazy_defaults = dict(
+        comments=list,
+        data=dict,
+        data_lines=list,
+        G=dict,
+        L=list,
+        M=str,
+        positioner=dict,
+        N=lambda: -1,
+        P=list,
+        Q=str,
+        T=str,
+        V=list,
+        column_first=str,
+        column_last=str,
+    )
+    _lazy_installed = []  # names of the lazy attributes installed
+
     def __init__(self, header, buf, parent=None):
+        if len(self._lazy_installed) != len(ControlLineBase.lazy_attributes):
+            _install_lazy_attributes(SpecDataFileScan)
         self.parent = parent  # instance of SpecDataFile
-        self.comments = []
-        self.data = {}
-        self.data_lines = []
         self.date = ""
-        self.G = {}
 
         # index number of relevant #F section previously interpreted
         self.header = header
 
-        self.L = []
-        self.M = ""
-        self.positioner = {}
-        self.N = -1
-        self.P = []
-        self.Q = ""
-        self.raw = buf
+        self.raw = buf  # see set_raw_location()
         self.S = ""
         self.scanNum = -1
         self.scanCmd = ""
@@ -678,10 +1304,6 @@ class SpecDataFileScan(object):
                 self.specFile = self.header.parent.fileName
         else:
             self.specFile = None
-        self.T = ""
-        self.V = []
-        self.column_first = ""
-        self.column_last = ""
         self.postprocessors = {}
         self.h5writers = {}
 
@@ -694,13 +1316,30 @@ class SpecDataFileScan(object):
     def __str__(self):
         return self.S
 
-    def __getattribute__(self, attr):
-        from .control_lines import control_line_registry
+    @property
+    def raw(self):
+        """text of this scan, as reported in the SPEC data file"""
+        if self._raw is None and self._raw_location is not None:
+            return self.parent._read_section_(*self._raw_location)
+        return self._raw
+
+    @raw.setter
+    def raw(self, buf):
+        self._raw = buf
+        self._raw_location = None
+
+    def set_raw_location(self, offset, length):
+        """
+        read text of this scan from the data file only when needed
 
-        if attr in control_line_registry.lazy_attributes:
-            if self.__lazy_interpret__:
-                self.interpret()
-        return object.__getattribute__(self, attr)
+        :param int offset: byte position of the scan's ``#S`` line in the file
+        :param int length: number of bytes in the scan's text
+
+        The text is no longer kept in memory.  It is read from
+        the file each time the ``raw`` attribute is used.
+        """
+        self._raw = None
+        self._raw_location = (offset, length)
 
     def get_macro_name(self):
         """
@@ -715,6 +1354,9 @@ class SpecDataFileScan(object):
         if self.__interpreted__:  # do not do this twice
             return
         self.__lazy_interpret__ = False  # set now to avoid recursion
+        for attr, default in self._lazy_defaults.items():
+            if attr not in self.__dict__:
+                setattr(self, attr, default())
         lines = self.raw.replace("\\\n", " ").splitlines()
         for _i, line in enumerate(lines, start=1):
             if len(line) == 0:
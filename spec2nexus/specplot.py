@@ -25,7 +25,6 @@ Exceptions:
 import os
 import numpy
 
-from . import charts
 from . import spec  # read SPEC data files
 from . import singletons
 from . import utils
@@ -492,6 +491,8 @@ class LinePlotter(ImageMaker):
 
         :param str plotFile: name of image file to write
         """
+        from . import charts  # matplotlib is imported when first needed
+
         assert self.signal in self.data
         assert len(self.axes) == 1
         assert self.axes[0] in self.data
@@ -624,6 +625,8 @@ class MeshPlotter(ImageMaker):
 
         :param str plotFile: name of image file to write
         """
+        from . import charts
+
         if len(self.axes) == 2:
             image = self.data[self.signal]
             self.set_plot_subtitle(
@@ -727,11 +730,7 @@ class MeshPlotter(ImageMaker):
         axis1 = axis1[0: intervals1 + 1]
         self.data[label1] = axis1  # 1-D array
 
-        axis2 = [
-            axis2[row]
-            for row in range(len(axis2))
-            if row % (intervals1 + 1) == 0
-        ]
+        axis2 = axis2[:: intervals1 + 1]
         self.data[label2] = axis2  # 1-D array
 
         column_labels = self.scan.L
@@ -748,7 +747,7 @@ class MeshPlotter(ImageMaker):
         data_shape = [len(axis2), len(axis1)]
         for label in column_labels:
             if label not in self.data:
-                axis = numpy.array(self.scan.data.get(label))
+                axis = numpy.asarray(self.scan.data.get(label))
                 self.data[label] = utils.reshape_data(axis, data_shape)
             else:
                 pass
@@ -763,7 +762,7 @@ class MeshPlotter(ImageMaker):
             ):
                 num_channels = len(spectrum[0])
                 data_shape.append(num_channels)
-                mca = numpy.array(spectrum)
+                mca = numpy.asarray(spectrum)
                 data = utils.reshape_data(mca, data_shape)
                 channels = range(1, num_channels + 1)
                 ds_name = "_" + key + "_"
@@ -0,0 +1,153 @@
+"""
+Regression benchmarks: the time to read a file should grow linearly.
+
+Times are compared for files of different size (not to fixed limits)
+so these tests do not depend on the speed of the computer.
+A linear process takes about 4x longer for 4x as many scans,
+a quadratic process takes about 16x longer.
+These (slow) benchmarks run only when the ``SPEC2NEXUS_BENCHMARKS``
+environment variable is set, such as::
+
+    SPEC2NEXUS_BENCHMARKS=1 pytest spec2nexus/tests/test_benchmarks.py
+
+Startup benchmarks report the time to import (in a new Python process)
+and check that heavy packages are not imported before they are needed.
+"""
+
+import json
+import os
+import pathlib
+import pytest
+import subprocess
+import sys
+import time
+
+from ._core import file_from_examples
+from ._core import testpath
+from .. import spec
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get("SPEC2NEXUS_BENCHMARKS"),
+    reason="set SPEC2NEXUS_BENCHMARKS to run the (slow) benchmarks",
+)
+
+SCAN_TEMPLATE = """
+#S {}  ascan  m1 0 1  2 1
+#D Wed May 07 20:46:25 2025
+#P0 0
+#N 2
+#L m1  I0
+0 1
+0.5 2
+1 3
+"""
+
+HEADER_TEMPLATE = """
+#E {}
+#D Wed May 07 20:45:25 2025
+#C benchmark  User = test
+#O0 m1
+#P0 0
+"""
+
+
+def write_spec_file(path, num_scans, first_scan=1, mode="w", header_every=0):
+    """
+    Write a SPEC data file with many (short) scans.
+
+    With ``header_every=N``, a new header (#E) is written before each Nth scan.
+    """
+    with open(path, mode) as f:
+        if mode == "w":
+            f.write("#F benchmark.dat\n")
+            f.write("#E 1746668725\n")
+            f.write("#D Wed May 07 20:45:25 2025\n")
+            f.write("#C benchmark  User = test\n")
+            f.write("#O0 m1\n")
+        for scan_number in range(first_scan, first_scan + num_scans):
+            if header_every > 0 and scan_number % header_every == 0:
+                f.write(HEADER_TEMPLATE.format(1746668725 + scan_number))
+            f.write(SCAN_TEMPLATE.format(scan_number))
+
+
+def elapsed(function, *args, **kwargs):
+    """Return (result, seconds) for function(*args, **kwargs)."""
+    t0 = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+@benchmark
+@pytest.mark.parametrize(
+    "sizes, header_every",
+    [
+        [(2_500, 10_000), 0],
+        [(5_000, 20_000), 2],  # header lines (such as #P) find the latest scan
+    ],
+)
+def test_read_many_scans(sizes, header_every, testpath):
+    path = pathlib.Path(testpath)
+    times = {}
+    for num_scans in sizes:
+        tfile = str(path / f"scans_{num_scans}.dat")
+        write_spec_file(tfile, num_scans, header_every=header_every)
+        sdf, t_read = elapsed(spec.SpecDataFile, tfile)
+        assert len(sdf.scans) == num_scans
+        if header_every > 0:
+            assert len(sdf.headers) == 1 + num_scans // header_every
+            assert sdf.getLatestScan() is sdf.getScan(num_scans)
+
+        # add one more scan, then read the whole file again
+        write_spec_file(tfile, 1, first_scan=num_scans + 1, mode="a")
+        _, t_reread = elapsed(sdf.read)
+        assert len(sdf.scans) == num_scans + 1
+        assert sdf.last_scan == str(num_scans + 1)
+        times[num_scans] = (t_read, t_reread)
+
+    small, large = sizes
+    for t_small, t_large in zip(times[small], times[large]):
+        assert t_large / t_small < 10, f"{times=}"
+
+
+STARTUP_SCRIPT = """
+import json, sys
+{}
+heavy = "h5py lxml matplotlib setuptools_scm".split()
+print(json.dumps([m for m in heavy if m in sys.modules]))
+"""
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import spec2nexus.spec",
+        "import spec2nexus.nexus",
+        "import spec2nexus.specplot",
+        "from spec2nexus import spec; spec.SpecDataFile({!r}).getScan(1).interpret()".format(
+            file_from_examples("33id_spec.dat")
+        ),
+    ],
+)
+def test_startup(code):
+    # startup time of the command-line programs:  heavy packages
+    # (and git, through setuptools_scm) are not imported until needed
+    process = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT.format(code)],
+        capture_output=True,
+        check=True,
+        cwd=pathlib.Path(__file__).parent.parent.parent,
+        text=True,
+    )
+    modules = json.loads(process.stdout)
+    assert modules == [], f"{code=} {modules=}"
+
+
+# -----------------------------------------------------------------------------
+# :author:    Pete R. Jemian
+# :email:     prjemian@gmail.com
+# :copyright: (c) 2014-2025, Pete R. Jemian
+#
+# Distributed under the terms of the Creative Commons Attribution 4.0 International Public License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# -----------------------------------------------------------------------------
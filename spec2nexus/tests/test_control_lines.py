@@ -1,6 +1,16 @@
+import json
+import pathlib
+import pytest
+import subprocess
+import sys
+
 from ..control_lines import control_line_registry
 from ..control_lines import ControlLines
+from ..plugin_core import ControlLineBase
+from ..plugins import MANIFEST
 from ._core import CONTROL_KEYS_TO_BE_TESTED
+from ._core import file_from_examples
+from ._core import file_from_tests
 
 
 def test_one():
@@ -19,3 +29,119 @@ def test_known_keys():
     known_keys = control_line_registry.known_keys
     for key in known_keys.keys():
         assert key in CONTROL_KEYS_TO_BE_TESTED
+
+
+@pytest.mark.parametrize(
+    "text",
+    """
+    #S #D #G0 #G12 #V110 #H4 #o0 #@CALIB #@Calib #@calib #@MCA @A @A1 @A22
+    #X #XPCS #Pete 1 -1 +1.5 .5 1e5 nan -inf Infinity ١ ² x _ # @
+    """.split(),
+)
+def test_dispatch_table(text):
+    """Same key as testing each plugin's match_key(), in order."""
+
+    def match_each_plugin(text):
+        for key, plugin in control_line_registry.known_keys.items():
+            if plugin.match_key(text):
+                return key
+        return None
+
+    expected = match_each_plugin(text)
+    assert control_line_registry.match_control_key(text) == expected
+    # again, now remembered
+    assert control_line_registry.match_control_key(text) == expected
+
+
+def test_manifest():
+    """The manifest describes the plugins in each file."""
+    found = {}
+    for key, plugin in control_line_registry.known_keys.items():
+        # as imported from the manifest ("uxml") or the package ("spec2nexus.plugins.uxml")
+        module = type(plugin).__module__.split(".")[-1]
+        manifest = found.setdefault(module, dict(keys=[], scan_attributes=[]))
+        manifest["keys"].append(key)
+        manifest["scan_attributes"] += plugin.scan_attributes_defined
+        if module in MANIFEST:
+            assert type(plugin).match_key is ControlLineBase.match_key, f"{plugin}"
+
+    for module, manifest in MANIFEST.items():
+        assert module in found
+        assert sorted(manifest["keys"]) == sorted(found[module]["keys"])
+        assert sorted(manifest["scan_attributes"]) == sorted(found[module]["scan_attributes"])
+
+
+LAZY_PLUGIN_SCRIPT = """
+import json, sys
+from spec2nexus import spec
+sdf = spec.SpecDataFile({!r})
+for scan in sdf.scans.values():
+    scan.interpret()
+modules = "apstools_specwriter lxml uim unicat uxml XPCS".split()
+print(json.dumps([m for m in modules if m in sys.modules]))
+"""
+
+
+@pytest.mark.parametrize(
+    "filename, imported",
+    [
+        [file_from_examples("lmn40.spe"), []],
+        [file_from_examples("CdSe"), ["unicat"]],
+        [file_from_tests("test_3.spec"), ["lxml", "unicat", "uxml"]],
+    ],
+)
+def test_lazy_plugins(filename, imported):
+    """Plugin files in the manifest are imported only when needed."""
+    process = subprocess.run(
+        [sys.executable, "-c", LAZY_PLUGIN_SCRIPT.format(filename)],
+        capture_output=True,
+        check=True,
+        cwd=pathlib.Path(__file__).parent.parent.parent,
+        text=True,
+    )
+    assert json.loads(process.stdout) == imported
+
+
+
+USER_PLUGIN = """
+import re
+from spec2nexus.plugin_core import ControlLineBase
+from spec2nexus.utils import strip_first_word
+
+class UserHeaderLabels(ControlLineBase):
+    key = r"#H\\d+"
+    scan_attributes_defined = ["H"]
+
+    def process(self, text, spec_obj, *args, **kws):
+        spec_obj.H.append(re.split(r"  +", strip_first_word(text).upper()))
+"""
+
+USER_PLUGIN_SCRIPT = """
+import json, sys
+from spec2nexus import spec
+from spec2nexus.control_lines import control_line_registry
+from spec2nexus.plugin_core import install_user_plugin
+install_user_plugin({!r})
+sdf = spec.SpecDataFile({!r})
+sdf.getScan(1).interpret()
+handler = control_line_registry.known_keys[r"#H\\d+"]
+print(json.dumps([type(handler).__module__, sdf.headers[0].H[0], "unicat" in sys.modules]))
+"""
+
+
+def test_user_plugin_overrides_lazy_plugin(tmp_path):
+    """A user plugin keeps its key when a plugin file with that key is imported later."""
+    plugin_file = tmp_path / "user_header_labels.py"
+    plugin_file.write_text(USER_PLUGIN)
+    script = USER_PLUGIN_SCRIPT.format(str(plugin_file), file_from_examples("CdSe"))
+    process = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        cwd=pathlib.Path(__file__).parent.parent.parent,
+        text=True,
+    )
+    module, labels, unicat_imported = json.loads(process.stdout)
+    assert module == "user_header_labels"
+    assert labels == ["SR_CURRENT", "SR_STATUS", "BAROMETER_MBAR"]
+    assert unicat_imported  # for its other key (#V)
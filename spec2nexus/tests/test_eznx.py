@@ -120,6 +120,77 @@ def test_write_dataset_existing(testpath):
         assert value == "replacement text"
 
 
+@pytest.mark.parametrize(
+    "shape, itemsize, target, expected",
+    [
+        [(1353, 256), 8, eznx.CHUNK_BYTES, (128, 256)],
+        [(41, 41, 1024), 8, eznx.CHUNK_BYTES, (1, 32, 1024)],
+        [(1_000_000,), 8, eznx.CHUNK_BYTES, (32768,)],
+        [(5, 3), 8, eznx.CHUNK_BYTES, (5, 3)],
+        [(5, 3), 8, 16, (1, 2)],
+        [(4, 100), 8, 100, (1, 12)],
+    ],
+)
+def test_chunk_shape(shape, itemsize, target, expected):
+    assert eznx.chunk_shape(shape, itemsize, target) == expected
+
+
+def test_write_dataset_options(testpath):
+    hfile = os.path.join(testpath, "hfile.h5")
+    data = numpy.arange(2000.0).reshape((20, 100))
+    with h5py.File(hfile, "w") as root:
+        options = dict(chunks=(2, 100), compression="gzip", shuffle=True)
+        ds = eznx.write_dataset(root, "data", data, dataset_options=options, units="counts")
+        assert ds.chunks == (2, 100)
+        assert ds.compression == "gzip"
+        assert ds.shuffle
+        assert ds.attrs["units"] == "counts"
+        assert "dataset_options" not in ds.attrs
+        ds = eznx.write_dataset(root, "list", data.tolist(), dataset_options=options)
+        assert ds.chunks == (2, 100)
+        ds = eznx.write_dataset(root, "plain", data)
+        assert ds.chunks is None
+        assert (root["list"][()] == data).all()
+
+
+@pytest.mark.parametrize(
+    "data, dtype, shape, value",
+    [
+        [numpy.arange(5), None, (5,), [0, 1, 2, 3, 4]],
+        [memoryview(numpy.arange(4.0)), None, (4,), [0.0, 1.0, 2.0, 3.0]],
+        [[1, 2, 3], None, (3,), [1, 2, 3]],
+        [[1, 2, 3], "float32", (3,), [1.0, 2.0, 3.0]],
+        [numpy.arange(3.0), "int16", (3,), [0, 1, 2]],
+        ["text", None, (1,), [b"text"]],
+        [["a", "bcd", ""], None, (3,), [b"a", b"bcd", b""]],
+        [numpy.array(["a", "bcd"]), None, (2,), [b"a", b"bcd"]],
+        [numpy.array([["a", "b"], ["c", "d"]]), None, (2, 2), [[b"a", b"b"], [b"c", b"d"]]],
+        [[["a", "b"], ["c", "d"]], None, (2, 2), [[b"a", b"b"], [b"c", b"d"]]],
+        [["café", "ab"], None, (2,), [b"caf", b"ab"]],
+        [["a", 1], None, (2,), [b"a", b"1"]],
+        [3.5, None, (1,), [3.5]],
+    ],
+)
+def test_write_dataset_values(data, dtype, shape, value, testpath):
+    hfile = os.path.join(testpath, "hfile.h5")
+    with h5py.File(hfile, "w") as root:
+        ds = eznx.write_dataset(root, "data", data, dtype=dtype)
+        assert ds.shape == shape
+        assert ds[()].tolist() == value
+        if dtype is not None:
+            assert ds.dtype == numpy.dtype(dtype)
+        if isinstance(value[0], bytes):
+            assert h5py.check_string_dtype(ds.dtype).encoding == "ascii"
+
+
+def test_makeDataset_no_copy():
+    data = numpy.arange(10.0)
+    assert eznx._dataset_value(data) is data
+    assert eznx._dataset_value(data, "float64") is data
+    view = eznx._dataset_value(memoryview(data))
+    assert numpy.shares_memory(view, data)
+
+
 def test_makeExternalLink(testpath):
     hfile = "hfile.h5"
     assert os.path.exists(testpath)
@@ -6,10 +6,13 @@ import pytest
 import shutil
 import sys
 import tempfile
+import types
 
 from . import _core
 from ._core import testpath
 from .. import nexus
+from .. import spec
+from .. import writer
 
 
 ARGV0 = sys.argv[0]
@@ -28,6 +31,10 @@ ARGV0 = sys.argv[0]
         ["spec_from_spock.spc", "-f --%s   -s 116", "quiet"],
         ["mca_spectra_example.dat", "-f --%s   -s 1", "quiet"],
         ["xpcs_plugin_sample.spec", "-f --%s   -s 1", "quiet"],
+        ["33id_spec.dat", "-f --%s   -p 2   -s 1,3-5,8", "quiet"],
+        ["33id_spec.dat", "-f --%s   -c gzip --shuffle   -s 1,22", "quiet"],
+        ["33id_spec.dat", "-f --%s   -c lzf   -p 2   -s 1,22", "quiet"],
+        ["33id_spec.dat", "-f --%s   --narrow   -s 1,22", "quiet"],
     ],
 )
 def test_example(filename, opts, noise, testpath):
@@ -64,6 +71,88 @@ def test_example(filename, opts, noise, testpath):
         assert isinstance(nxdata, h5py.Group), default + " is HDF5 Group"
 
 
+def test_update(testpath, capsys):
+    spec_file = _core.getActiveSpecDataFile(testpath)
+    hn = os.path.splitext(spec_file)[0] + ".hdf5"
+    sys.argv = [ARGV0, spec_file, "--update", "--verbose"]
+    nexus.main()
+    assert "wrote NeXus HDF5 file" in capsys.readouterr().out
+
+    _core.addMoreScans(spec_file)
+    nexus.main()
+    out = capsys.readouterr().out
+    assert "wrote scan number(s): 3, 4, 5" in out
+    assert "updated NeXus HDF5 file" in out
+    with h5py.File(hn, "r") as root:
+        assert len(root) == 5
+
+
+def test_update_other_file(testpath, capsys):
+    spec_file = _core.getActiveSpecDataFile(testpath)
+    hn = os.path.splitext(spec_file)[0] + ".hdf5"
+    with open(hn, "w") as f:
+        f.write("not HDF5")
+
+    sys.argv = [ARGV0, spec_file, "--update"]
+    nexus.main()
+    assert "cannot update, not an HDF5 file" in capsys.readouterr().out
+    with open(hn) as f:
+        assert f.read() == "not HDF5"  # not changed
+
+    sys.argv = [ARGV0, spec_file, "--update", "--force-overwrite"]
+    nexus.main()
+    assert "wrote NeXus HDF5 file" in capsys.readouterr().out
+    with h5py.File(hn, "r") as root:
+        assert len(root) == 3
+
+    other = spec.SpecDataFile(os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat"))
+    writer.Writer(other).save(hn, [1])
+    sys.argv = [ARGV0, spec_file, "--update"]
+    nexus.main()
+    assert "cannot update, not written from SPEC data file" in capsys.readouterr().out
+    with h5py.File(hn, "r") as root:
+        assert list(root) == ["S1"]
+
+
+def test_mirror(testpath, capsys, monkeypatch):
+    intervals = []
+
+    def interrupt(seconds):
+        intervals.append(seconds)
+        raise KeyboardInterrupt  # stop after the first poll
+
+    monkeypatch.setattr(nexus.writer, "time", types.SimpleNamespace(sleep=interrupt))
+    spec_file = _core.getActiveSpecDataFile(testpath)
+    hn = os.path.splitext(spec_file)[0] + ".hdf5"
+    sys.argv = [ARGV0, "--mirror", spec_file, "--mirror-interval", "0.1", "--verbose"]
+    nexus.main()
+    assert intervals == [0.1]
+    out = capsys.readouterr().out
+    assert "wrote scan number(s): 1, 2, 3" in out
+    assert "stopped mirror to NeXus HDF5 file" in out
+    with h5py.File(hn, "r") as root:
+        assert len(root) == 3
+        assert root["S3/data/ar"].maxshape == (None,)
+
+    sys.argv = [ARGV0, spec_file, spec_file, "--mirror"]
+    with pytest.raises(SystemExit):
+        nexus.main()
+
+    # not a mirror of this SPEC data file
+    writer.Writer(spec.SpecDataFile(spec_file)).save(hn, ["1"])
+    sys.argv = [ARGV0, spec_file, "--mirror"]
+    nexus.main()
+    assert "cannot mirror, not written by a mirror" in capsys.readouterr().out
+    with h5py.File(hn, "r") as root:
+        assert list(root) == ["S1"]
+
+    sys.argv = [ARGV0, spec_file, "--mirror", "-f"]
+    nexus.main()
+    assert "stopped mirror to NeXus HDF5 file" in capsys.readouterr().out
+    with h5py.File(hn, "r") as root:
+        assert len(root) == 3
+
+
 # -----------------------------------------------------------------------------
 # :author:    Pete R. Jemian
 # :email:     prjemian@gmail.com
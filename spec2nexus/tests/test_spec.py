@@ -1,6 +1,7 @@
 """Tests for the spec module."""
 
 from contextlib import nullcontext as does_not_raise
+import gc
 import h5py
 import numpy as np
 import os
@@ -8,6 +9,7 @@ import pathlib
 import platform
 import pytest
 import time
+import weakref
 
 from . import _core
 from ._core import EXAMPLES_PATH
@@ -484,6 +486,160 @@ def test_specfile_refresh(testpath):
     assert len(sdf.getScanNumbers()) == 5
 
 
+@pytest.mark.parametrize("indexed", [False, True])
+def test_specfile_refresh_incremental(indexed, testpath, monkeypatch):
+    spec_file = _core.getActiveSpecDataFile(testpath)
+    sdf = spec.SpecDataFile(spec_file, indexed=indexed)
+    assert sdf.getScanNumbers() == ["1", "2", "3"]
+    scan1 = sdf.getScan(1)
+
+    # last scan grows
+    with open(spec_file, "a") as f:
+        f.write("\n#C more data\n")
+    time.sleep(SHORT_WAIT)
+    offsets = []
+    file_sections = spec.SpecDataFile._file_sections_
+
+    def spy(self, start=0):
+        offsets.append(start)
+        return file_sections(self, start)
+
+    monkeypatch.setattr(spec.SpecDataFile, "_file_sections_", spy)
+    assert sdf.refresh() == "3"
+    assert offsets[0] > 0  # did not read from the start of the file
+    assert sdf.getScanNumbers() == ["1", "2", "3"]
+    assert sdf.getScan(1) is scan1  # not parsed again
+    assert sdf.getScan(3).raw.endswith("#C more data")
+
+    # new scans
+    _core.addMoreScans(spec_file)
+    time.sleep(SHORT_WAIT)
+    assert sdf.refresh() == "3"
+    assert min(offsets) > 0
+    assert sdf.getScanNumbers() == ["1", "2", "3", "4", "5"]
+    assert sdf.getScan(1) is scan1
+
+    reference = spec.SpecDataFile(spec_file)
+    for key, scan in reference.scans.items():
+        assert sdf.scans[key].raw == scan.raw
+    assert (
+        sdf.getScanNumbersChronological()
+        == reference.getScanNumbersChronological()
+    )
+    assert len(sdf._chronology_) == len(sdf.scans)
+    assert sdf.getScanNumbers() == reference.getScanNumbers()
+    assert len(sdf._numbering_) == len(sdf.scans)
+
+    # truncated: read the whole file again
+    with open(_core.file_from_tests("refresh1.txt"), "rb") as f:
+        original = f.read()
+    with open(spec_file, "wb") as f:
+        f.write(original[: len(original) // 2])
+    time.sleep(SHORT_WAIT)
+    sdf.refresh()
+    assert offsets[-1] == 0 or indexed
+    assert sdf.getScan(1) is not scan1
+    assert len(sdf.getScanNumbers()) < 3
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+@pytest.mark.parametrize(
+    "written",
+    [
+        "#S 4  ascan  a2rp 2.71 3.71  40 0.2\n#D Wed Nov 03 13:4",  # not all of #D
+        "#S 4  ascan  a2rp 2.71 3.71  40 0.2\n",  # no #D yet
+    ],
+    ids=["partial #D", "no #D"],
+)
+def test_specfile_refresh_incomplete(written, indexed, testpath):
+    spec_file = _core.getActiveSpecDataFile(testpath)
+    sdf = spec.SpecDataFile(spec_file, indexed=indexed)
+    assert sdf.getScanNumbers() == ["1", "2", "3"]
+    scan3 = sdf.getScan(3)
+    chronological = sdf.getScanNumbersChronological()
+
+    # SPEC is still writing the start of scan 4
+    with open(_core.file_from_tests("refresh2.txt"), "r") as f:
+        more_scans = f.read()
+    cut = more_scans.index("#S 4") + len(written)
+    assert more_scans[:cut].endswith(written)
+    with open(spec_file, "a") as f:
+        f.write(more_scans[:cut])
+    time.sleep(SHORT_WAIT)
+    with pytest.raises(ValueError):
+        sdf.refresh()
+    # unchanged
+    assert sdf.getScanNumbers() == ["1", "2", "3"]
+    assert sdf.getScan(3) is scan3
+    assert sdf.getScanNumbersChronological() == chronological
+
+    # the rest of the scans is written
+    with open(spec_file, "a") as f:
+        f.write(more_scans[cut:])
+    time.sleep(SHORT_WAIT)
+    assert sdf.refresh() == "3"
+
+    reference = spec.SpecDataFile(spec_file)
+    assert sdf.getScanNumbers() == reference.getScanNumbers()
+    assert (
+        sdf.getScanNumbersChronological()
+        == reference.getScanNumbersChronological()
+    )
+    for key, scan in reference.scans.items():
+        assert sdf.scans[key].raw == scan.raw
+        assert sdf.scans[key].data == scan.data
+    assert len(sdf._chronology_) == len(sdf.scans)
+    assert len(sdf._numbering_) == len(sdf.scans)
+
+
+@pytest.mark.parametrize(
+    "filename",
+    "33bm_spec.dat 33id_spec.dat CdOsO lmn40.spe".split(),
+)
+def test_scan_numbers_chronological(filename, monkeypatch):
+    sdf = spec.SpecDataFile(file_from_examples(filename))
+
+    def by_date(scan):
+        return time.strptime(scan.date)
+
+    expected = [scan.scanNum for scan in sorted(sdf.scans.values(), key=by_date)]
+
+    def not_expected(*args, **kwargs):
+        raise RuntimeError("dates should not be parsed again")
+
+    monkeypatch.setattr(time, "strptime", not_expected)
+    assert sdf.getScanNumbersChronological() == expected
+    assert sdf.getFirstScanNumber() == expected[0]
+    assert sdf.getLastScanNumber() == expected[-1]
+
+    # date-range selection
+    epochs = sorted(scan.epoch for scan in sdf.scans.values())
+    start, stop = epochs[len(epochs) // 4], epochs[len(epochs) // 2]
+    selected = sdf.getScanNumbersChronological(start=start, stop=stop)
+    assert selected == [
+        key for key in expected if start <= sdf.getScan(key).epoch < stop
+    ]
+    assert sdf.getScanNumbersChronological(stop=epochs[0]) == []
+    assert sdf.getScanNumbersChronological(start=epochs[0]) == expected
+
+
+def test_scan_number_index():
+    sdf = spec.SpecDataFile(file_from_examples("20220311-161530.dat"))
+    scan_numbers = sdf.getScanNumbers()
+    assert scan_numbers.index("1.9") + 1 == scan_numbers.index("1.10")
+    assert scan_numbers[-1] == "5.14"  # sorted by (scan, repeat)
+    assert sdf.getMaxScanNumber() == "5.14"
+    assert sdf.getMinScanNumber() == "1"
+    assert sdf.getScan(-1).scanNum == "5.14"
+    assert sdf.getScan(0).scanNum == "1"
+
+    chronological = sdf.getScanNumbersChronological()
+    expected = [k for k in chronological if 2 <= float(k) < 4]
+    assert [scan.scanNum for scan in sdf[2:4]] == expected
+    expected = [k for k in expected if utils.split_scan_number_string(k)[1] == 10]
+    assert [scan.scanNum for scan in sdf[2:4:10]] == expected
+
+
 @pytest.mark.parametrize(
     "filename, given, scanlist",
     [
@@ -649,6 +805,516 @@ def test_is_spec_file(lines, header, sdf, context, expression, testpath):
     if expression is not None:
         assert expression in str(exinfo)
 
+
+def test_is_spec_file_limit(testpath):
+    path = pathlib.Path(testpath)
+    tfile = path / "late_scan.dat"
+    data = b"1 2 3\n" * 10_000
+    tfile.write_bytes(data + b"#S 1 test_scan\n")
+    assert spec.is_spec_file(tfile)
+    assert not spec.is_spec_file(tfile, limit=len(data))
+    assert spec.is_spec_file(tfile, limit=len(data) + 3)
+
+    tfile = path / "header.dat"
+    header = b"#F spec.dat\r#E 1746668725\r#D Wed May 07 20:45:25 2025\r#C test\r"
+    tfile.write_bytes(header)
+    assert spec.is_spec_file_with_header(tfile)
+    assert not spec.is_spec_file_with_header(tfile, limit=len(header) // 2)
+
+    tfile = path / "binary.dat"
+    tfile.write_bytes(b"\x89HDF\0\0\n#S 1 test_scan\n")
+    assert not spec.is_spec_file(tfile)
+
+
+@pytest.mark.parametrize(
+    "filename",
+    "33bm_spec.dat 33id_spec.dat CdOsO twoc.dat 20220311-161530.dat".split(),
+)
+def test_indexed(filename):
+    """Indexed mode reads scan text from the file only when needed."""
+    sdf = spec.SpecDataFile(file_from_examples(filename))
+    indexed = spec.SpecDataFile(file_from_examples(filename), indexed=True)
+    assert not sdf.indexed
+    assert indexed.indexed
+
+    assert indexed.getScanNumbers() == sdf.getScanNumbers()
+    assert [h.raw for h in indexed.headers] == [h.raw for h in sdf.headers]
+    for key, scan in sdf.scans.items():
+        indexed_scan = indexed.getScan(key)
+        assert indexed_scan._raw is None, (filename, key)
+        assert indexed_scan._raw_location is not None, (filename, key)
+        assert indexed_scan.raw == scan.raw, (filename, key)
+        assert indexed_scan.S == scan.S, (filename, key)
+        assert indexed_scan.date == scan.date, (filename, key)
+        assert indexed_scan.L == scan.L, (filename, key)
+        assert indexed_scan.data == scan.data, (filename, key)
+
+
+@pytest.mark.parametrize(
+    "filename",
+    "33id_spec.dat CdOsO lmn40.spe".split(),  # CdOsO: duplicate scan numbers
+)
+def test_iter_scans(filename):
+    """Scans from the iterator are the same as from SpecDataFile."""
+    sdf = spec.SpecDataFile(file_from_examples(filename))
+    scan_numbers = []
+    for scan in spec.iter_scans(file_from_examples(filename)):
+        reference = sdf.getScan(scan.scanNum)
+        assert scan.raw == reference.raw
+        assert scan.header.raw == reference.header.raw
+        assert scan.date == reference.date
+        assert scan.data == reference.data
+        assert "data" in scan.__dict__  # interpreted
+        assert len(scan.parent.headers) == 1  # only the most recent
+        assert scan.parent.getLatestScan() is scan
+        assert list(scan.parent.scans.values()).count(None) == len(scan_numbers)
+        scan_numbers.append(scan.scanNum)
+    assert scan_numbers == list(sdf.scans)  # includes duplicates
+
+    scan = next(spec.iter_scans(file_from_examples(filename), interpret=False))
+    assert "data" not in scan.__dict__
+    assert scan.date == sdf.getScan(scan.scanNum).date
+
+    with pytest.raises(spec.SpecDataFileNotFound):
+        next(spec.iter_scans("missing_file"))
+
+
+@pytest.mark.parametrize("eol", ["\n", "\r\n", "\r"])
+def test_index_file(eol, testpath):
+    lines = [
+        "#F spec.dat",
+        "#E 1746668725",
+        "#D Wed May 07 20:45:25 2025",
+        "#C test  User = test",
+        "",
+        "#S 1  ascan  m1 0 1  2 1",
+        "#D Wed May 07 20:46:25 2025",
+        "#N 2",
+        "#L m1  I0",
+        "0 1",
+        "0.5 2",
+        "1 3",
+        "",
+        "#S 2  ascan  m1 0 1  1 1",
+        "#D Wed May 07 20:47:25 2025",
+        "#N 2",
+        "#L m1  I0",
+        "0 10",
+        "1 30",
+    ]
+    tfile = pathlib.Path(testpath) / "testfile.dat"
+    with open(tfile, "wb") as f:
+        f.write(eol.join(lines).encode())
+
+    sdf = spec.SpecDataFile(str(tfile), indexed=True)
+    sections = sdf.index_file()
+    assert len(sections) == 4  # #F, #E, #S 1, #S 2
+    assert sections[0][0] == 0
+    assert sum(length for _offset, length in sections) == tfile.stat().st_size
+
+    assert sdf.getScanNumbers() == ["1", "2"]
+    scan = sdf.getScan(2)
+    assert scan.raw == "\n".join(lines[13:])
+    assert scan.data["I0"] == [10, 30]
+
+
+@pytest.mark.parametrize("eol", [b"\n", b"\r\n", b"\r"])
+def test_section_starts(eol):
+    lines = [
+        b"#F spec.dat",
+        b"#E 1746668725",
+        b"#C comment about #S and #E",
+        b"  #S 1  ascan  m1 0 1  2 1",  # indented
+        b"#Should not start a section",
+        b"0 1",
+        b"#S\t2  ascan  m1 0 1  1 1",
+        b"#S",
+    ]
+    buf = eol.join(lines)
+    starts = spec._section_starts(buf)
+    expected = [0, 1, 3, 6, 7]  # line numbers
+    assert starts == [len(eol.join(lines[:n] + [b""])) for n in expected]
+
+    # from the start of a section, in a memory-mapped file
+    assert spec._section_starts(memoryview(buf), starts[2]) == starts[2:]
+    assert spec._section_starts(b"") == []
+
+
+def test_dissect_file(testpath):
+    tfile = pathlib.Path(testpath) / "empty.dat"
+    tfile.write_bytes(b"")
+    sdf = spec.SpecDataFile(None)
+    sdf.fileName = str(tfile)
+    with pytest.raises(spec.NotASpecDataFile):
+        sdf.dissect_file()
+
+    sdf = spec.SpecDataFile(file_from_examples("33id_spec.dat"))
+    sections = sdf.dissect_file()
+    assert len(sections) == 2 + len(sdf.scans)  # #F, #E, then #S ...
+    assert sections[2] == sdf.getScan(1).raw
+    assert [block for block, _loc in sdf._file_sections_()] == sections
+
+
+def test_sidecar(testpath, monkeypatch):
+    tfile = pathlib.Path(testpath) / "33id_spec.dat"
+    with open(file_from_examples("33id_spec.dat"), "rb") as f:
+        tfile.write_bytes(f.read())
+    sidecar = pathlib.Path(str(tfile) + spec.SIDECAR_SUFFIX)
+    assert not sidecar.exists()
+
+    reference = spec.SpecDataFile(str(tfile))
+    sdf = spec.SpecDataFile(str(tfile), sidecar=True)
+    assert sdf.indexed
+    assert sdf.sidecar == str(sidecar)
+    assert sidecar.exists()
+
+    def not_expected(*args, **kwargs):
+        raise RuntimeError("data file should not be scanned")
+
+    # re-open from the sidecar, without scanning the data file
+    monkeypatch.setattr(spec.SpecDataFile, "index_file", not_expected)
+    sdf = spec.SpecDataFile(str(tfile), sidecar=str(sidecar))
+    assert sdf.getScanNumbers() == reference.getScanNumbers()
+    assert sdf.getScanCommands() == reference.getScanCommands()
+    assert (
+        sdf.getScanNumbersChronological()
+        == reference.getScanNumbersChronological()
+    )
+    assert sdf.getScan(5).raw == reference.getScan(5).raw
+    assert sdf.getScan(5).data == reference.getScan(5).data
+    monkeypatch.undo()
+
+    # changed data file: sidecar is not valid, then re-written
+    with open(tfile, "a") as f:
+        f.write("\n#S 999 ascan  m1 0 1  1 1\n#D Thu Jul 17 03:37:32 2003\n#N 2\n#L m1  I0\n0 10\n1 30\n")
+    sdf = spec.SpecDataFile(str(tfile), sidecar=True)
+    assert "999" in sdf.getScanNumbers()
+    monkeypatch.setattr(spec.SpecDataFile, "index_file", not_expected)
+    sdf = spec.SpecDataFile(str(tfile), sidecar=True)
+    assert "999" in sdf.getScanNumbers()
+    assert sdf.getScan(999).data["I0"] == [10, 30]
+
+    # corrupt sidecar is ignored
+    sidecar.write_text("not JSON")
+    monkeypatch.undo()
+    sdf = spec.SpecDataFile(str(tfile), sidecar=True)
+    assert len(sdf.getScanNumbers()) == len(reference.getScanNumbers()) + 1
+
+
+@pytest.mark.parametrize(
+    "rows, num_columns, expected",
+    [
+        [["1 2", "3 4"], 2, [[1, 2], [3, 4]]],
+        [["1 2", "3"], 2, [[1, 2]]],  # incomplete row
+        [["1 2", "3 4 5", "6 7"], 2, [[1, 2], [6, 7]]],  # too many values
+        [["1 2", "3 x", "5 6"], 2, [[1, 2], [5, 6]]],  # not a number
+        [["1e3 -2.5", "nan 1"], 2, [[1000, -2.5], [np.nan, 1]]],
+        [["1", "2", "3"], 1, [[1], [2], [3]]],
+        [["1 2 3"], 3, [[1, 2, 3]]],
+        [[], 2, np.empty((0, 2))],
+        [["3"], 2, np.empty((0, 2))],
+    ],
+)
+def test_parse_data_rows(rows, num_columns, expected):
+    from ..plugins.spec_common import parse_data_rows
+
+    array = parse_data_rows(rows, num_columns)
+    assert array.dtype == float
+    assert array.shape == (len(expected), num_columns)
+    assert np.allclose(array, expected, equal_nan=True)
+
+
+def test_data_lines_bulk(testpath):
+    num_points = 10_000
+    lines = [
+        "#S 1  ascan  m1 0 1  2 1",
+        "#D Wed May 07 20:46:25 2025",
+        "#N 3",
+        "#L m1  I0  I",
+    ]
+    for i in range(num_points):
+        lines.append(f"{i} {i * 2} {i * 0.5}")
+        if i == 5:
+            lines.append("#C comment between data lines")
+            lines.append("1 2")  # incomplete: ignored
+    tfile = pathlib.Path(testpath) / "bulk.dat"
+    tfile.write_text("\n".join(lines) + "\n")
+
+    scan = spec.SpecDataFile(str(tfile)).getScan(1)
+    assert list(scan.data) == ["m1", "I0", "I"]
+    assert len(scan.data["m1"]) == num_points
+    assert scan.data["m1"][-1] == num_points - 1
+    assert scan.data["I0"][7] == 14
+    assert scan.data["I"][3] == 1.5
+
+
+@pytest.mark.parametrize(
+    "filename, scan_number",
+    [
+        ["33id_spec.dat", 1],  # MCA
+        ["33id_spec.dat", 22],  # mesh
+        ["33bm_spec.dat", 17],  # hklmesh
+        ["lmn40.spe", 3],
+    ],
+)
+def test_columnar(filename, scan_number):
+    specFile = file_from_examples(filename)
+    legacy = spec.SpecDataFile(specFile).getScan(scan_number)
+    scan = spec.SpecDataFile(specFile, columnar=True).getScan(scan_number)
+    assert list(scan.data) == list(legacy.data)
+    for label in scan.L:
+        column = scan.data[label]
+        assert isinstance(column, np.ndarray)
+        assert column.flags.c_contiguous
+        assert isinstance(legacy.data[label], list)
+        assert column.tolist() == legacy.data[label]
+    for key, spectra in scan.data.get(spec.MCA_DATA_KEY, {}).items():
+        assert isinstance(spectra, np.ndarray)
+        assert spectra.ndim == 2
+        assert spectra.tolist() == legacy.data[spec.MCA_DATA_KEY][key]
+
+
+@pytest.mark.parametrize(
+    "lines, dtype, expected",
+    [
+        [["@A 1 2 3", "@A 4 5 6"], np.int64, [[1, 2, 3], [4, 5, 6]]],
+        [["@A1 1.5 2 3", "@A1 4 5 6e2"], np.float64, [[1.5, 2, 3], [4, 5, 600]]],
+        [["@A\t1  2\t3"], np.int64, [[1, 2, 3]]],
+        [["@A 1 2 3", "@A 4 5"], None, None],  # different lengths
+        [["@A 1 2 3", "@A 4 x 6"], None, None],  # not a number
+        [["@A 1 2 3\\"], None, None],  # unjoined continuation
+        [["@A"], None, None],
+        [[], None, None],
+    ],
+)
+def test_decode_mca_spectra(lines, dtype, expected):
+    from ..plugins.spec_common import decode_mca_spectra
+
+    spectra = decode_mca_spectra(lines)
+    if expected is None:
+        assert spectra is None
+    else:
+        assert spectra.dtype == dtype
+        assert spectra.tolist() == expected
+
+
+def test_decode_mca_spectra_exact():
+    from ..plugins.spec_common import decode_mca_spectra
+    from ..plugins.spec_common import decode_mca_spectrum
+
+    rng = np.random.default_rng(12345)
+    lines = [
+        "@A " + " ".join(map(repr, (rng.random(1024) * 10**i).tolist()))
+        for i in range(-5, 6)
+    ]
+    spectra = decode_mca_spectra(lines)
+    assert spectra.shape == (len(lines), 1024)
+    assert spectra.tolist() == list(map(decode_mca_spectrum, lines))
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_mca_continued_lines(columnar, testpath):
+    lines = [
+        "#S 1  ascan  m1 0 1  2 1",
+        "#D Wed May 07 20:46:25 2025",
+        "#N 4 2",
+        "#L m1  I0  m1  I0",
+        "@A 1 2 3 4\\",
+        " 5 6 7 8",
+        "0 10",
+        "20 30",
+        "@A 10 20 30 40\\",
+        " 50 60 70 80",
+        "1 11",
+        "21 31",
+        "@A 1 2 3 4\\",
+        " 5 6.5 7 8",
+        "2 12 22 32",
+    ]
+    tfile = pathlib.Path(testpath) / "mca.dat"
+    tfile.write_text("\n".join(lines) + "\n")
+
+    scan = spec.SpecDataFile(str(tfile), columnar=columnar).getScan(1)
+    spectra = scan.data[spec.MCA_DATA_KEY]["mca"]
+    expected = [
+        [1, 2, 3, 4, 5, 6, 7, 8],
+        [10, 20, 30, 40, 50, 60, 70, 80],
+        [1, 2, 3, 4, 5, 6.5, 7, 8],
+    ]
+    if columnar:
+        assert spectra.shape == (3, 8)
+        assert spectra.dtype == np.float64
+        assert spectra.tolist() == expected
+    else:
+        assert spectra == expected
+        # int unless the spectrum has a decimal point
+        assert isinstance(spectra[0][0], int)
+        assert isinstance(spectra[2][0], float)
+    assert len(scan.data["m1"]) == 3
+
+
+def test_lazy_attributes():
+    from ..control_lines import control_line_registry
+
+    sdf = spec.SpecDataFile(file_from_examples("33id_spec.dat"))
+    scan = sdf.getScan(5)
+    assert not scan.__interpreted__
+    assert "data" not in vars(scan)
+    assert scan.scanCmd.startswith("ascan")  # not a lazy attribute
+    assert not scan.__interpreted__
+
+    assert len(scan.L) > 0  # first use of a lazy attribute
+    assert scan.__interpreted__
+    # now, values are found in the scan's dictionary
+    assert "data" in vars(scan)
+    assert scan.data is vars(scan)["data"]
+
+    # lazy attribute not defined in this scan
+    assert "R" in control_line_registry.lazy_attributes
+    assert not hasattr(scan, "R")
+    with pytest.raises(AttributeError) as exc:
+        scan.R
+    assert exc.value.args[0] == "'SpecDataFileScan' object has no attribute 'R'"
+
+
+def test_lazy_header(testpath):
+    sdf = spec.SpecDataFile(file_from_examples("CdOsO"))
+    header = sdf.headers[0]
+    assert header.epoch > 0  # #D is interpreted as the file is read
+    assert "comments" not in vars(header)
+
+    assert len(header.O) > 0  # first use interprets the header
+    assert "comments" in vars(header)
+    expected = spec.SpecDataFileHeader(header.raw)
+    expected.interpret()
+    assert header.comments == expected.comments
+    assert header.O == expected.O
+    assert header.H == expected.H
+
+    with pytest.raises(AttributeError):
+        header.no_such_attribute
+
+    # SPEC restarts:  new header, same text (but for #E & #D)
+    text = "\n".join(
+        [
+            "#F restarts.dat",
+            "#E 1746668725",
+            "#D Wed May 07 20:45:25 2025",
+            "#C restarts  User = test",
+            "#O0 m1  m2",
+            "#H0 title  sample",
+            "",
+            "#E 1746668785",
+            "#D Wed May 07 20:46:25 2025",
+            "#C restarts  User = test",
+            "#O0 m1  m2",
+            "#H0 title  sample",
+            "",
+        ]
+    )
+    tfile = os.path.join(testpath, "restarts.dat")
+    with open(tfile, "w") as f:
+        f.write(text)
+    sdf = spec.SpecDataFile(tfile)
+    h1, h2 = sdf.headers
+    assert h1.O == h2.O == [["m1", "m2"]]
+    assert len(sdf._header_cache_) == 1
+    assert h1.O is not h2.O  # not the same (mutable) list
+    assert h1.epoch != h2.epoch
+
+    # nested (mutable) values are not shared
+    h1.O[0][0] = "renamed"
+    h1.H[0].append("changed")
+    assert h2.O == [["m1", "m2"]]
+    assert h2.H == [["title", "sample"]]
+    assert spec.SpecDataFile(tfile).headers[1].O == [["m1", "m2"]]
+
+
+def test_lazy_header_positioners(testpath):
+    # #P lines in a header add to the latest scan, as the file is read
+    blocks = ["#F restarts.dat"]
+    for i in range(1, 1501):  # more than the recursion limit
+        blocks += [
+            f"#E {1746668725 + i}",
+            "#D Wed May 07 20:45:25 2025",
+            "#O0 m1",
+            "#P0 1" if i > 1 else "#C no scan before this header",
+            "",
+            f"#S {i}  ascan  m1 0 1  2 1",
+            "#D Wed May 07 20:46:25 2025",
+            "#P0 2",
+            "#N 2",
+            "#L m1  I0",
+            "0 1",
+            "",
+        ]
+    tfile = os.path.join(testpath, "restarts.dat")
+    with open(tfile, "w") as f:
+        f.write("\n".join(blocks))
+    sdf = spec.SpecDataFile(tfile)
+    assert sdf.getScan(1500).P == [["2"]]
+    assert sdf.getScan(1).P == [["2"], ["1"]]  # and #P0 of the next header
+    assert sdf.getScan(1).positioner == {"m1": 2.0}
+    assert sdf.headers[1].getLatestScan() is sdf.getScan(1)
+
+    # headers do not keep scans from iter_scans
+    scans = []
+    for scan in spec.iter_scans(tfile):
+        scans.append(weakref.ref(scan))
+    gc.collect()
+    assert [ref() for ref in scans[:-1]].count(None) == len(scans) - 1
+
+
+def test_lazy_header_scan_positioner_names(testpath):
+    # #O lines in a scan replace the names in its (lazy) header
+    text = "\n".join(
+        [
+            "#F renamed.dat",
+            "#E 1746668725",
+            "#D Wed May 07 20:45:25 2025",
+            "#O0 a  b",
+            "",
+            "#S 1  ascan  a 0 1  1 1",
+            "#D Wed May 07 20:46:25 2025",
+            "#O0 x  y",
+            "#P0 1 2",
+            "#N 2",
+            "#L a  I0",
+            "0 1",
+            "",
+            "#S 2  ascan  x 0 1  1 1",
+            "#D Wed May 07 20:47:25 2025",
+            "#P0 3 4",
+            "#N 2",
+            "#L x  I0",
+            "0 1",
+            "",
+        ]
+    )
+    tfile = os.path.join(testpath, "renamed.dat")
+    with open(tfile, "w") as f:
+        f.write(text)
+    sdf = spec.SpecDataFile(tfile)
+    assert sdf.getScan(1).positioner == {"x": 1.0, "y": 2.0}
+    assert sdf.headers[0].comments == []  # header interpreted after the scan
+    assert sdf.headers[0].O == [["x", "y"]]
+    assert sdf.getScan(2).positioner == {"x": 3.0, "y": 4.0}
+
+
+def test_interned_labels():
+    sdf = spec.SpecDataFile(file_from_examples("33id_spec.dat"))
+    s1, s2 = sdf.getScan(3), sdf.getScan(4)  # same #L line
+    assert s1.L == s2.L
+    assert s1.L is not s2.L  # each scan may rename its labels
+    # same strings, but for the last label:  renamed (unique) as "I0_1"
+    assert all(a is b for a, b in zip(s1.L[:-1], s2.L[:-1]))
+
+    text = "two theta  I0  I 0"
+    labels = sdf._interned_labels_(text)
+    assert labels == ["two theta", "I0", "I 0"]
+    assert sdf._interned_labels_(text) is not labels
+    assert sdf._interned_labels_(text, str.split) == "two theta I0 I 0".split()
+
 # ----------------------
 # -------------------------------------------------------
 # :author:    Pete R. Jemian
@@ -16,6 +16,12 @@ def test_clean_name():
     result = utils.clean_name(candidate)
     assert candidate == result
 
+    assert utils.clean_name("two theta (deg.)") == "two_theta__deg__"
+    hits = utils.clean_name.cache_info().hits
+    assert utils.clean_name("two theta (deg.)") == "two_theta__deg__"
+    assert utils.clean_name.cache_info().hits == hits + 1
+    assert utils.clean_name.cache_info().maxsize == utils.CLEAN_NAME_CACHE_SIZE
+
 
 def test_iso8601():
     expected = "2010-11-03T13:39:34"
@@ -51,6 +57,37 @@ def test_reshape_data():
     assert (spec == expected).all()
 
 
+@pytest.mark.parametrize(
+    "values, dtype, expected",
+    [
+        [[0, 1, 300], "float64", "uint16"],
+        [[0, 1, 70_000], "float64", "uint32"],
+        [[-1, 5], "float64", "int8"],
+        [[-200, 5], "float64", "int16"],
+        [[0, 255], "int64", "uint8"],
+        [[0.5, 1.25], "float64", "float32"],
+        [[float("nan"), 1], "float64", "float32"],
+        [[1e10, 3], "float64", "float32"],
+        [[-0.0, 1], "float64", "float32"],
+        [[0.1, 1], "float64", None],
+        [[2**40, 1], "int64", None],
+        [[1, 2], "int8", None],
+        [[True, False], "bool", None],
+        [[], "float64", None],
+    ],
+)
+def test_narrow_dtype(values, dtype, expected):
+    arr = numpy.array(values, dtype=dtype)
+    result = utils.narrow_dtype(arr)
+    if expected is None:
+        assert result is None
+    else:
+        assert result == numpy.dtype(expected)
+        narrowed = arr.astype(result)
+        assert numpy.array_equal(narrowed, arr, equal_nan=True)  # lossless
+        assert numpy.signbit(narrowed).tolist() == numpy.signbit(arr).tolist()
+
+
 @pytest.mark.parametrize(
     "key, expected",
     [
@@ -3,9 +3,12 @@
 import h5py
 import os
 import pytest
+import subprocess
+import sys
 
 from . import _core
 from ._core import hfile
+from .. import eznx
 from .. import spec
 from .. import writer
 
@@ -107,6 +110,366 @@ def test_hkl_scans(filename, scan_number, signal, axes, hfile):
         assert nxdata.attrs["axes"] == axes
 
 
+@pytest.mark.parametrize(
+    "filename, scan_number",
+    [
+        ["33id_spec.dat", 1],  # MCA
+        ["33id_spec.dat", 22],  # mesh
+        ["33bm_spec.dat", 17],  # hklmesh
+        ["lmn40.spe", 3],
+    ],
+)
+def test_columnar_same_file(filename, scan_number, tmp_path):
+    """Columnar mode writes the same data as the default (list) mode."""
+    spec_file = os.path.join(_core.EXAMPLES_PATH, filename)
+    results = []
+    for columnar in (False, True):
+        hfile = str(tmp_path / f"columnar_{columnar}.h5")
+        sdf = spec.SpecDataFile(spec_file, columnar=columnar)
+        writer.Writer(sdf).save(hfile, [scan_number])
+        data = {}
+        with h5py.File(hfile, "r") as root:
+            nxdata = root[f"/S{scan_number}/data"]
+            for name, ds in nxdata.items():
+                data[name] = (ds.dtype, ds.shape, ds[()].tolist())
+            data["@"] = dict(nxdata.attrs)
+        results.append(data)
+
+    assert results[0].keys() == results[1].keys()
+    for name in results[0]:
+        if name != "@":
+            assert results[0][name] == results[1][name], name
+    assert str(results[0]["@"]) == str(results[1]["@"])
+
+
+def hdf5_contents(hdf_file):
+    """Describe every link, attribute, and dataset in an HDF5 file."""
+    contents = []
+
+    def walk(group, path):
+        contents.append((path, "@", str(list(group.attrs.items()))))
+        for name in group:
+            obj = group[name]
+            where = f"{path}/{name}"
+            rc = h5py.h5o.get_info(obj.id).rc  # number of hard links
+            if isinstance(obj, h5py.Group):
+                contents.append((where, "group", rc))
+                walk(obj, where)
+            else:
+                value = obj[()]
+                if hasattr(value, "tolist"):
+                    value = value.tolist()
+                contents.append((where, str(obj.dtype), obj.shape, rc, value))
+                contents.append((where, "@", str(list(obj.attrs.items()))))
+
+    with h5py.File(hdf_file, "r") as root:
+        walk(root, "")
+    return contents
+
+
+@pytest.mark.parametrize(
+    "filename, scan_list",
+    [
+        ["33id_spec.dat", [3, 1, 22, 2, 4, 5, 8]],  # MCA, mesh
+        ["33bm_spec.dat", [17, 1, 2]],  # hklmesh
+        ["03_06_JanTest.dat", [1, 2, 3]],
+        ["lmn40.spe", ["3", "1", "2", "4"]],
+    ],
+)
+def test_save_parallel(filename, scan_list, tmp_path):
+    """Parallel processes write the same file as a serial run."""
+    spec_file = os.path.join(_core.EXAMPLES_PATH, filename)
+    sdf = spec.SpecDataFile(spec_file)
+    results = []
+    for processes in (None, 3):
+        hfile = str(tmp_path / f"processes_{processes}.h5")
+        writer.Writer(sdf).save(hfile, scan_list, processes=processes)
+        results.append(hdf5_contents(hfile))
+        with h5py.File(hfile, "r") as root:
+            assert root.attrs["default"] == f"S{scan_list[0]}"
+
+    assert len(results[0]) > 0
+    assert results[0] == results[1]
+
+
+class TitledWriter(writer.Writer):
+    """Writer subclass with its own signature and option."""
+
+    def __init__(self, title, spec_data):
+        super().__init__(spec_data, compression="gzip", min_size=1)
+        self.title = title
+
+    def save_scan(self, nxentry, scan):
+        super().save_scan(nxentry, scan)
+        eznx.write_dataset(nxentry, "subclass_title", self.title)
+
+
+def test_save_parallel_subclass(tmp_path):
+    """Worker processes use the same (subclass of) Writer, with its options."""
+    sdf = spec.SpecDataFile(os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat"))
+    results = []
+    for processes in (None, 2):
+        hfile = str(tmp_path / f"processes_{processes}.h5")
+        TitledWriter("my title", sdf).save(hfile, [1, 22, 2], processes=processes)
+        results.append(hdf5_contents(hfile))
+        with h5py.File(hfile, "r") as root:
+            assert root["S22/subclass_title"][()] == [b"my title"]
+            assert root["S22/data/I0"].compression == "gzip"
+
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(compression="gzip"),
+        dict(compression="gzip", compression_opts=9, shuffle=True),
+        dict(compression="lzf"),
+        dict(shuffle=True),
+    ],
+)
+@pytest.mark.parametrize("processes", [None, 2])
+def test_save_compressed(options, processes, tmp_path):
+    """Compressed file has the same content, arrays are chunked."""
+    spec_file = os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat")
+    scan_list = [1, 22]  # MCA, mesh (with MCA)
+    plain = str(tmp_path / "plain.h5")
+    writer.Writer(spec.SpecDataFile(spec_file)).save(plain, scan_list)
+    compressed = str(tmp_path / "compressed.h5")
+    out = writer.Writer(spec.SpecDataFile(spec_file), **options)
+    out.save(compressed, scan_list, processes=processes)
+    assert hdf5_contents(plain) == hdf5_contents(compressed)
+
+    with h5py.File(compressed, "r") as root:
+        for path in ("S1/data/_mca_", "S22/data/_mca_"):
+            ds = root[path]
+            assert ds.size >= writer.COMPRESSION_MIN_SIZE
+            assert ds.chunks is not None
+            assert ds.chunks[-1] == ds.shape[-1]  # whole spectra
+            assert ds.compression == options.get("compression")
+            assert ds.shuffle == options.get("shuffle", False)
+        # small arrays, text, and scalars:  contiguous, no filters
+        for path in ("S1/data/eta", "S1/title", "S1/scan_number"):
+            ds = root[path]
+            assert ds.chunks is None
+            assert ds.compression is None
+
+
+def test_writer_compression_choices():
+    sdf = spec.SpecDataFile(os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat"))
+    with pytest.raises(ValueError):
+        writer.Writer(sdf, compression="zip")
+
+    out = writer.Writer(sdf, compression="gzip", min_size=10)
+    assert out.dataset_options(list(range(9))) == {}
+    assert out.dataset_options(["a"] * 10) == {}
+    assert out.dataset_options(range(10)) == {}  # written as [range(10)]
+    assert out.dataset_options([1.5] * 10) == dict(chunks=(10,), compression="gzip")
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_save_narrow(processes, tmp_path):
+    """Narrowed file has the same values, in smaller data types."""
+    spec_file = os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat")
+    scan_list = [1, 22]  # MCA, mesh (with MCA)
+    plain = str(tmp_path / "plain.h5")
+    writer.Writer(spec.SpecDataFile(spec_file)).save(plain, scan_list)
+    narrow = str(tmp_path / "narrow.h5")
+    out = writer.Writer(spec.SpecDataFile(spec_file), narrow=True)
+    out.save(narrow, scan_list, processes=processes)
+
+    with h5py.File(plain, "r") as p_root, h5py.File(narrow, "r") as n_root:
+        for path in ("S1/data/_mca_", "S22/data/I0", "S22/data/_mca_"):
+            original, narrowed = p_root[path], n_root[path]
+            assert narrowed.dtype.itemsize < original.dtype.itemsize
+            assert narrowed.attrs["spec_dtype"] == str(original.dtype)
+            assert (narrowed[()] == original[()]).all()
+        # text, scalars, small arrays, and other numbers:  as before
+        for path in ("S1/title", "S1/scan_number", "S1/data/I0", "S22/data/H"):
+            assert n_root[path].dtype == p_root[path].dtype
+            assert "spec_dtype" not in n_root[path].attrs
+
+
+def test_narrow_data():
+    sdf = spec.SpecDataFile(os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat"))
+    out = writer.Writer(sdf, narrow=True)
+    n = writer.NARROW_MIN_SIZE
+    data, spec_dtype = out.narrow_data([1.0] * n)
+    assert data.dtype.name == "uint8"
+    assert spec_dtype == "float64"
+    small = [1.0] * (n - 1)
+    assert out.narrow_data(small) == (small, None)
+    assert out.narrow_data(5.0) == (5.0, None)
+    assert out.narrow_data(["a"] * n) == (["a"] * n, None)
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_save_update(processes, tmp_path):
+    """Update writes only new and changed scans, same file as a full save."""
+    spec_file = _core.getActiveSpecDataFile(str(tmp_path))
+    hfile = str(tmp_path / "update.h5")
+    sdf = spec.SpecDataFile(spec_file)
+    assert writer.Writer(sdf).save(hfile, sdf.getScanNumbers()) == ["1", "2", "3"]
+    with h5py.File(hfile, "r") as root:
+        assert len(root["S3"].attrs["SPEC_scan_sha1"]) == 40
+
+    # nothing new
+    out = writer.Writer(spec.SpecDataFile(spec_file))
+    assert out.save(hfile, sdf.getScanNumbers(), update=True) == []
+
+    _core.addMoreScans(spec_file)  # scan 3 is longer, scans 4 & 5 are new
+    sdf = spec.SpecDataFile(spec_file)
+    out = writer.Writer(sdf)
+    written = out.save(hfile, sdf.getScanNumbers(), processes=processes, update=True)
+    assert written == ["3", "4", "5"]
+
+    full = str(tmp_path / "full.h5")
+    writer.Writer(spec.SpecDataFile(spec_file)).save(full, sdf.getScanNumbers())
+    assert hdf5_contents(hfile) == hdf5_contents(full)
+
+    with h5py.File(hfile, "a") as root:
+        assert root.attrs["SPEC_last_scan"] == "5"
+        del root.attrs["SPEC_last_scan"]  # compare the digest of every scan
+    assert out.save(hfile, sdf.getScanNumbers(), update=True) == []
+
+
+def test_save_update_other_source(tmp_path):
+    """Update refuses a file that is not HDF5 or was written from another SPEC data file."""
+    hfile = str(tmp_path / "update.h5")
+    sdf = spec.SpecDataFile(os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat"))
+    writer.Writer(sdf).save(hfile, [1])
+
+    spec_file = _core.getActiveSpecDataFile(str(tmp_path))
+    sdf = spec.SpecDataFile(spec_file)
+    with pytest.raises(writer.CannotUpdateFile, match="not written from SPEC data file"):
+        writer.Writer(sdf).save(hfile, ["2"], update=True)
+    with h5py.File(hfile, "r") as root:
+        assert list(root) == ["S1"]  # not changed
+
+    text_file = tmp_path / "notes.h5"
+    text_file.write_text("not HDF5")
+    with pytest.raises(writer.CannotUpdateFile, match="not an HDF5 file"):
+        writer.Writer(sdf).save(str(text_file), ["2"], update=True)
+    assert text_file.read_text() == "not HDF5"
+
+    # update of a file not written yet
+    hfile = str(tmp_path / "new.h5")
+    assert writer.Writer(sdf).save(hfile, ["1"], update=True) == ["1"]
+
+
+def test_mirror(tmp_path):
+    """Mirror appends new points to the last scan, writes new scans, same file as a full save."""
+    spec_file = _core.getActiveSpecDataFile(str(tmp_path))
+    hfile = str(tmp_path / "mirror.h5")
+    more = open(os.path.join(_core.TEST_DATA_PATH, "refresh2.txt")).read().splitlines(True)
+
+    mirror = writer.Mirror(writer.Writer(spec.SpecDataFile(spec_file)), hfile)
+    assert mirror.poll() == ["1", "2", "3"]
+    assert mirror.poll() == []  # nothing new
+    ds = mirror.root["S3/data/ar"]
+    assert ds.maxshape == (None,)
+    npts = len(ds)
+
+    with open(spec_file, "a") as fp:
+        fp.writelines(more[:3])  # new points of scan 3
+    assert mirror.poll() == ["3"]
+    assert len(ds) == npts + 3
+
+    # another process follows the last scan
+    code = "import h5py; "
+    code += f"root = h5py.File({hfile!r}, 'r', libver='latest', swmr=True); "
+    code += "print(len(root['S3/data/ar']))"
+    reader = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert reader.stdout.strip() == str(npts + 3)
+
+    with open(spec_file, "a") as fp:
+        fp.writelines(more[3:])  # scan 3 is complete, scans 4 & 5 are new
+    assert mirror.poll() == ["3", "4", "5"]
+    assert mirror.writer.live_scan == "5"
+    assert "SPEC_scan_sha1" in mirror.root["S3"].attrs
+    assert "SPEC_scan_sha1" not in mirror.root["S5"].attrs  # might not be complete
+    mirror.close()
+
+    # update writes the last scan again
+    sdf = spec.SpecDataFile(spec_file)
+    assert writer.Writer(sdf).save(hfile, sdf.getScanNumbers(), update=True) == ["5"]
+    full = str(tmp_path / "full.h5")
+    writer.Writer(sdf).save(full, sdf.getScanNumbers())
+    assert hdf5_contents(hfile) == hdf5_contents(full)
+
+    # a mirror continues with its own file
+    assert writer.Mirror(writer.Writer(sdf), hfile).poll() == ["5"]
+
+
+def test_mirror_incomplete(tmp_path):
+    """Mirror keeps what it wrote before when SPEC has not finished writing a line."""
+    lines = open(os.path.join(_core.EXAMPLES_PATH, "33id_spec.dat")).read().splitlines(True)
+    assert lines[74].startswith("@A ")  # MCA spectrum of the second point of scan 1
+    assert lines[355].startswith("#S 2 ")
+    assert lines[399].startswith("@A ")  # second point of scan 2
+    spec_file = str(tmp_path / "33id_spec.dat")
+    hfile = str(tmp_path / "mirror.h5")
+
+    def spec_writes(line, partial=0):
+        """SPEC has written the file up to ``partial`` characters of this line."""
+        text = "".join(lines[:line]) + lines[line][:partial]
+        with open(spec_file, "a") as fp:
+            fp.write(text[fp.tell():])
+
+    spec_writes(74)
+    mirror = writer.Mirror(writer.Writer(spec.SpecDataFile(spec_file)), hfile)
+    assert mirror.poll() == ["1"]
+    assert len(mirror.root["S1/data/eta"]) == 1
+
+    spec_writes(75, 10)  # in the middle of an @A line
+    assert mirror.poll() == []
+    assert len(mirror.root["S1/data/eta"]) == 1
+    spec_writes(81)
+    assert mirror.poll() == ["1"]
+    assert len(mirror.root["S1/data/eta"]) == 2
+
+    spec_writes(356)  # new scan, #S but no #D
+    assert mirror.poll() == []
+    spec_writes(399, 10)  # new scan, in the middle of an @A line
+    assert mirror.poll() == ["1"]
+    assert "S2" not in mirror.root  # try again at the next poll
+    spec_writes(680)
+    assert mirror.poll() == ["2"]
+    mirror.close()
+
+    sdf = spec.SpecDataFile(spec_file)
+    assert writer.Writer(sdf).save(hfile, sdf.getScanNumbers(), update=True) == ["2"]
+    full = str(tmp_path / "full.h5")
+    writer.Writer(sdf).save(full, sdf.getScanNumbers())
+    assert hdf5_contents(hfile) == hdf5_contents(full)
+
+
+def test_mirror_other_file(tmp_path):
+    """Mirror does not overwrite an existing file that is not its mirror (unless asked)."""
+    spec_file = _core.getActiveSpecDataFile(str(tmp_path))
+    sdf = spec.SpecDataFile(spec_file)
+    hfile = str(tmp_path / "converted.h5")
+    writer.Writer(sdf).save(hfile, ["1"])  # same source, but not for SWMR
+    text_file = tmp_path / "notes.h5"
+    text_file.write_text("not HDF5")
+
+    for filename, message in [
+        [hfile, "not written by a mirror"],
+        [str(text_file), "not an HDF5 file"],
+    ]:
+        mirror = writer.Mirror(writer.Writer(sdf), filename)
+        with pytest.raises(writer.CannotUpdateFile, match=message):
+            mirror.poll()
+        assert mirror.root is None
+    with h5py.File(hfile, "r") as root:
+        assert list(root) == ["S1"]  # not changed
+    assert text_file.read_text() == "not HDF5"
+
+    mirror = writer.Mirror(writer.Writer(sdf), hfile, overwrite=True)
+    assert mirror.poll() == ["1", "2", "3"]
+    mirror.close()
+
+
 # -----------------------------------------------------------------------------
 # :author:    Pete R. Jemian
 # :email:     prjemian@gmail.com
@@ -7,6 +7,7 @@
 
     ~clean_name
     ~iso8601
+    ~narrow_dtype
     ~reshape_data
     ~sanitize_name
     ~split_column_labels
@@ -15,15 +16,19 @@
 
 """
 
+import functools
 import logging
-import numpy
 import re
 import time
 
 
 logger = logging.getLogger(__name__)
 
+CLEAN_NAME_CACHE_SIZE = 4096
+NONCOMPLIANT_CHARACTERS = re.compile(r"[^\w_]")
 
+
+@functools.lru_cache(maxsize=CLEAN_NAME_CACHE_SIZE)
 def clean_name(key):
     r"""
     create a name that is allowed by both HDF5 and NeXus rules
@@ -38,12 +43,13 @@ def clean_name(key):
 
     An easier expression might be:  ``[\w_]*`` but this will not pass
     the rule that valid NeXus group or field names cannot start with a digit.
+
+    The same few names are cleaned for every scan in a file:  the most
+    recent results (up to ``CLEAN_NAME_CACHE_SIZE``) are remembered.
     """
     replacement = "_"
-    noncompliance = r"[^\w_]"
-    txt = replacement.join(
-        re.split(noncompliance, key)
-    )  # replace ALL non-compliances with '_'
+    # replace ALL non-compliances with '_'
+    txt = NONCOMPLIANT_CHARACTERS.sub(replacement, key)
     if txt[0].isdigit():
         txt = replacement + txt  # can't start with a digit
     return txt
@@ -133,6 +139,59 @@ def sanitize_name(group, key):  # for legacy support only
     return clean_name(key)
 
 
+def narrow_dtype(array):
+    """
+    Return the smallest data type that holds all the numbers in array exactly.
+
+    Integer values (even if stored as floating point numbers) get the
+    smallest integer type for their range (such as ``uint16`` for
+    counts up to 65535).  Other numbers get ``float32`` if it holds
+    each of them exactly.  Returns ``None`` if no type is smaller than
+    ``array.dtype`` (or if array does not hold real numbers).
+
+    :param obj array: numpy array
+    """
+    import numpy
+
+    if array.dtype.kind not in "iuf" or array.size == 0:
+        return None
+
+    candidates = []
+    if array.dtype.kind in "iu":
+        candidates.append(_integer_dtype(int(array.min()), int(array.max())))
+    else:
+        if numpy.isfinite(array).all() and (numpy.trunc(array) == array).all():
+            # -0.0 is not an integer value:  keep its sign
+            if not numpy.signbit(array[array == 0]).any():
+                candidates.append(
+                    _integer_dtype(int(array.min()), int(array.max()))
+                )
+        if array.dtype.itemsize > 4:
+            single = array.astype(numpy.float32)
+            if numpy.array_equal(single, array, equal_nan=True):
+                candidates.append(single.dtype)
+
+    candidates = [
+        dtype
+        for dtype in candidates
+        if dtype.kind in "iuf" and dtype.itemsize < array.dtype.itemsize
+    ]
+    if len(candidates) == 0:
+        return None
+    return min(candidates, key=lambda dtype: dtype.itemsize)
+
+
+def _integer_dtype(lo, hi):
+    """(internal) smallest integer data type for numbers from lo to hi"""
+    import numpy
+
+    for name in "uint8 int8 uint16 int16 uint32 int32 uint64 int64".split():
+        info = numpy.iinfo(name)
+        if info.min <= lo and hi <= info.max:
+            return numpy.dtype(name)
+    return numpy.dtype(object)  # no integer type: not a candidate
+
+
 def reshape_data(scan_data, scan_shape):
     """
     Shape scan data from raw to different dimensionality
@@ -144,6 +203,8 @@ def reshape_data(scan_data, scan_shape):
 
     modified from nexpy.readers.readspec.reshape_data
     """
+    import numpy
+
     scan_size = numpy.prod(scan_shape)
     if scan_data.size == scan_size:
         data = scan_data
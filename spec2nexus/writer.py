@@ -7,16 +7,23 @@
 .. autosummary::
 
     ~Writer
+    ~Mirror
+    ~CannotUpdateFile
 """
 
 
-import h5py
+import hashlib
+import io
+import logging
 import numpy as np
+import os
+import time
 
 from . import eznx
 from . import spec
 from . import utils
 
+logger = logging.getLogger(__name__)
 
 # see: https://download.nexusformat.org/doc/html/classes/base_classes/index.html
 # CONTAINER_CLASS = 'NXlog'          # information that is recorded against time
@@ -24,87 +31,253 @@ CONTAINER_CLASS = "NXnote"  # any additional freeform information not covered by
 # CONTAINER_CLASS = 'NXparameters'   # Container for parameters, usually used in processing or analysis
 # CONTAINER_CLASS = 'NXcollection'    # Use NXcollection to gather together any set of terms
 
+COMPRESSION_FILTERS = ("gzip", "lzf")
+COMPRESSION_MIN_SIZE = 1024  # smaller arrays are written contiguous, without filters
+NARROW_MIN_SIZE = 64  # smaller arrays are written in their data type (little to save)
+MIRROR_INTERVAL = 1.0  # seconds between reads of the SPEC data file, see Mirror
+MIRROR_CHUNK_ROWS = 1024  # resizable arrays are written in chunks of (up to) this many rows
+
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 
+class CannotUpdateFile(ValueError):
+    """existing file is not HDF5 or was not written from this SPEC data file"""
+
+
 class Writer(object):
 
     """
     writes out scans from SPEC data file to NeXus HDF5 file
 
     :param obj spec_data: instance of :class:`~spec2nexus.spec.SpecDataFile`
+    :param str compression: (default: ``None``)
+        HDF5 compression filter (``"gzip"`` or ``"lzf"``) for arrays of numbers
+    :param int compression_opts: (default: ``None``)
+        gzip compression level (0-9), see the h5py documentation
+    :param bool shuffle: (default: ``False``)
+        use the HDF5 shuffle filter (before compression) for arrays of numbers
+    :param int min_size: (default: ``COMPRESSION_MIN_SIZE``)
+        arrays with fewer items (and all text and scalar values)
+        are written contiguous, without filters
+    :param bool narrow: (default: ``False``)
+        write arrays of numbers (at least ``NARROW_MIN_SIZE`` items)
+        in the smallest data type that holds them exactly
+        (see :meth:`narrow_data`)
+
+    Arrays are written in chunks (see :func:`~spec2nexus.eznx.chunk_shape`)
+    when filters are used.  Override :meth:`dataset_options`
+    (in a subclass) for a different policy.
 
     .. autosummary::
 
+        ~dataset_options
+        ~extend_data
         ~mca_spectra
         ~mesh
+        ~narrow_data
         ~oneD
         ~root_attributes
         ~save
         ~save_data
         ~save_dict
+        ~save_entry
         ~save_scan
         ~write_ds
     """
 
-    def __init__(self, spec_data):
+    def __init__(
+        self,
+        spec_data,
+        compression=None,
+        compression_opts=None,
+        shuffle=False,
+        min_size=COMPRESSION_MIN_SIZE,
+        narrow=False,
+    ):
+        if compression not in (None,) + COMPRESSION_FILTERS:
+            raise ValueError(
+                f"compression must be one of {COMPRESSION_FILTERS}, received {compression!r}"
+            )
         self.spec = spec_data
-
-    def save(self, hdf_file, scan_list=None):
+        self.compression = compression
+        self.compression_opts = compression_opts
+        self.shuffle = shuffle
+        self.min_size = min_size
+        self.narrow = narrow
+        self.live_scan = None  # scan written with resizable arrays, see Mirror
+        self._growing_ = False
+
+    def save(self, hdf_file, scan_list=None, processes=None, update=False):
         """
         save the information in this SPEC data file to a NeXus HDF5 file
 
         Each scan in scan_list will be converted to a **NXentry** group.
 
+        With ``processes`` greater than 1, the scans are interpreted
+        in a pool of worker processes.  Each worker returns its
+        **NXentry** (as an in-memory HDF5 file image) and only this
+        process writes to ``hdf_file``, in the order of ``scan_list``.
+        The file written is the same as from a serial run.
+
+        With ``update=True``, an existing ``hdf_file`` (written from
+        the same SPEC data file) is updated:  only the scans that are new
+        or have changed are written.  The other **NXentry** groups are kept.
+        SPEC appends to its data file, so only the scan that was the last
+        one (root attribute ``SPEC_last_scan``) when ``hdf_file`` was
+        written could have changed (more data was collected).  Each
+        **NXentry** records a digest of the scan's text
+        (attribute ``SPEC_scan_sha1``) to decide if the scan changed.
+        Raises :class:`CannotUpdateFile` if ``hdf_file`` is not an HDF5
+        file or was written from another SPEC data file.
+
         :param str hdf_file: name of NeXus HDF5 file to be written
         :param [int] scanlist: list of scan numbers to be read
+        :param int processes: number of worker processes
+            (default: ``None``, interpret and write each scan in turn)
+        :param bool update: (default: ``False``)
+            write only new and changed scans to an existing ``hdf_file``
+        :return: list of the scan numbers written
         """
+        import h5py  # imported when first needed
+
         scan_list = scan_list or []
 
+        if update and os.path.exists(hdf_file):
+            self._check_update_(hdf_file)
+            with h5py.File(hdf_file, "a") as root:
+                scan_list = self._changed_scans_(root, scan_list)
+                return self._write_entries_(root, scan_list, processes)
+
         with h5py.File(hdf_file, "w") as root:
-            eznx.addAttributes(root, **self.root_attributes())
-
-            pick_first_entry = True
-            for key in scan_list:
-                nxentry = eznx.makeGroup(root, f"S{key}", "NXentry")
-                eznx.makeDataset(
-                    nxentry,
-                    "experiment_description",
-                    "SPEC scan",
-                    description="SPEC data file scan",
+            return self._write_entries_(root, scan_list, processes)
+
+    def _write_entries_(self, root, scan_list, processes):
+        """(internal) write the root attributes and an NXentry for each scan"""
+        eznx.addAttributes(root, **self.root_attributes())
+
+        if processes is not None and processes > 1 and len(scan_list) > 1:
+            entries = self._parallel_entries_(root, scan_list, processes)
+        else:
+            entries = (self.save_entry(root, key) for key in scan_list)
+
+        written = []
+        pick_first_entry = "default" not in root.attrs
+        for key in entries:
+            if pick_first_entry:
+                pick_first_entry = False
+                eznx.addAttributes(root, default="S" + str(key))
+            written.append(key)
+        return written
+
+    def _check_update_(self, hdf_file):
+        """(internal) raise CannotUpdateFile unless this existing file could be updated"""
+        import h5py
+
+        if not h5py.is_hdf5(hdf_file):
+            raise CannotUpdateFile(f"not an HDF5 file: {hdf_file}")
+        with h5py.File(hdf_file, "r") as root:
+            if not self._same_source_(root):
+                raise CannotUpdateFile(
+                    f"not written from SPEC data file {self.spec.specFile}: {hdf_file}"
                 )
-                self.save_scan(nxentry, self.spec.getScan(key))
-                if pick_first_entry:
-                    pick_first_entry = False
-                    eznx.addAttributes(root, default="S" + str(key))
-                if "data" not in nxentry:
-                    # NXentry MUST have a NXdata group with data for default plot
-                    nxdata = eznx.makeGroup(
-                        nxentry,
-                        "data",
-                        "NXdata",
-                        signal="no_y_data",
-                        axes="no_x_data",
-                        no_x_data_indices=[0],
-                    )
-                    eznx.makeDataset(
-                        nxdata,
-                        "no_x_data",
-                        (0, 1),
-                        units="none",
-                        long_name="no data points in this scan",
-                    )
-                    eznx.makeDataset(
-                        nxdata,
-                        "no_y_data",
-                        (0, 1),
-                        units="none",
-                        long_name="no data points in this scan",
-                    )
+
+    def _same_source_(self, root):
+        """(internal) Was this HDF5 file written from this SPEC data file?"""
+        return (
+            root.attrs.get("SPEC_file") == self.spec.specFile
+            and root.attrs.get("SPEC_epoch") == self.spec.headers[0].epoch
+        )
+
+    def _changed_scans_(self, root, scan_list):
+        """(internal) scans in scan_list not written yet (or changed), remove changed entries"""
+        last_scan = root.attrs.get("SPEC_last_scan")  # if None, check every scan
+        changed = []
+        for key in scan_list:
+            name = f"S{key}"
+            if name in root:
+                if last_scan is not None and str(key) != last_scan:
+                    continue  # scan was complete when written
+                digest = root[name].attrs.get("SPEC_scan_sha1")
+                if digest == _scan_digest(self.spec.getScan(key)):
+                    continue  # unchanged
+                del root[name]  # write it again
+            changed.append(key)
+        return changed
+
+    def save_entry(self, root, key):
+        """*internal*: write one scan to its own **NXentry** group, return ``key``"""
+        nxentry = eznx.makeGroup(root, f"S{key}", "NXentry")
+        eznx.makeDataset(
+            nxentry,
+            "experiment_description",
+            "SPEC scan",
+            description="SPEC data file scan",
+        )
+        scan = self.spec.getScan(key)
+        self._growing_ = key == self.live_scan
+        try:
+            self.save_scan(nxentry, scan)
+        finally:
+            self._growing_ = False
+        if "data" not in nxentry:
+            # NXentry MUST have a NXdata group with data for default plot
+            nxdata = eznx.makeGroup(
+                nxentry,
+                "data",
+                "NXdata",
+                signal="no_y_data",
+                axes="no_x_data",
+                no_x_data_indices=[0],
+            )
+            eznx.makeDataset(
+                nxdata,
+                "no_x_data",
+                (0, 1),
+                units="none",
+                long_name="no data points in this scan",
+            )
+            eznx.makeDataset(
+                nxdata,
+                "no_y_data",
+                (0, 1),
+                units="none",
+                long_name="no data points in this scan",
+            )
+        if key != self.live_scan:
+            # last:  an entry with a digest is complete (the live scan might not be)
+            eznx.addAttributes(nxentry, SPEC_scan_sha1=_scan_digest(scan))
+        return key
+
+    def _parallel_entries_(self, root, scan_list, processes):
+        """(internal) interpret scans in worker processes, copy each NXentry into root"""
+        from concurrent.futures import ProcessPoolExecutor
+        import copy
+        import h5py
+        from . import plugin_core
+
+        worker = copy.copy(self)  # with all its options, also from a subclass
+        worker.spec = None  # each worker process reads the SPEC data file
+        initargs = (
+            worker,
+            self.spec.fileName,
+            self.spec.columnar,
+            list(plugin_core.installed_plugin_files),
+        )
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker, initargs=initargs
+        ) as pool:
+            chunksize = max(1, len(scan_list) // (4 * processes))
+            images = pool.map(_entry_image, scan_list, chunksize=chunksize)
+            for key, image in zip(scan_list, images):
+                with h5py.File(io.BytesIO(image), "r") as source:
+                    name = f"S{key}"
+                    source.copy(source[name], root, name=name)
+                yield key
 
     def root_attributes(self):
         """*internal*: returns the attributes to be written to the root element as a dict"""
+        import h5py
         from . import __version__
 
         header0 = self.spec.headers[0]
@@ -119,6 +292,9 @@ class Writer(object):
             HDF5_Version=h5py.version.hdf5_version,
             numpy_version=h5py.version.numpy.version.full_version,
         )
+        last_scan = next(reversed(self.spec.scans), None)  # in file order
+        if last_scan is not None:
+            dd["SPEC_last_scan"] = str(last_scan)
         try:
             c = header0.comments[0]
             user = c[c.find("User = "):].split("=")[1].strip()
@@ -243,6 +419,45 @@ class Writer(object):
                 k = "%s%s" % (axis_name, "_indices")
                 eznx.addAttributes(nxdata, **{k: indices})
 
+    def extend_data(self, nxdata, scan):
+        """
+        *internal*: append the new data points of a 1-D scan to its resizable arrays
+
+        Returns ``False`` (and writes nothing) unless each column
+        (and MCA spectra) of the scan is in ``nxdata`` as a resizable
+        array (the scan was the ``live_scan``) of the same shape,
+        except for the number of points.
+        """
+        import h5py
+
+        scan.interpret()
+        if scan.scanCmd.split()[0] in ("mesh", "hklmesh"):
+            return False  # 2-D data, see mesh()
+        arrays = {}
+        for column in scan.L:
+            if column not in scan.data:
+                return False
+            arrays[utils.clean_name(column)] = scan.data[column]
+        for key, spectrum in scan.data.get(spec.MCA_DATA_KEY, {}).items():
+            arrays["_" + key + "_"] = spectrum
+
+        updates = []
+        for name, data in arrays.items():
+            ds = nxdata.get(name)
+            data = np.asarray(data)
+            if not isinstance(ds, h5py.Dataset) or ds.maxshape[:1] != (None,):
+                return False
+            if data.shape[1:] != ds.shape[1:] or data.ndim != ds.ndim or len(data) < len(ds):
+                return False
+            updates.append((ds, data))
+
+        for ds, data in updates:
+            n = len(ds)
+            if len(data) > n:
+                ds.resize(len(data), axis=0)
+                ds[n:] = data[n:]
+        return True
+
     def oneD(self, nxdata, scan):
         """*internal*: generic data parser for 1-D column data, returns signal and axis"""
         for column in scan.L:
@@ -327,11 +542,7 @@ class Writer(object):
             signal, axes = self.oneD(nxdata, scan)  # fallback support
         else:
             axis1 = axis1[0: intervals1 + 1]
-            axis2 = [
-                axis2[row]
-                for row in range(len(axis2))
-                if row % (intervals1 + 1) == 0
-            ]
+            axis2 = axis2[:: intervals1 + 1]
 
             column_labels = scan.L
             column_labels.remove(label1)  # special handling
@@ -353,7 +564,7 @@ class Writer(object):
             data_shape = [len(axis1), len(axis2)]
             for label in column_labels:
                 if label not in nxdata:
-                    axis = np.array(scan.data.get(label))
+                    axis = np.asarray(scan.data.get(label))
                     self.write_ds(
                         nxdata, label, utils.reshape_data(axis, data_shape)
                     )
@@ -370,7 +581,7 @@ class Writer(object):
             ):
                 num_channels = len(spectrum[0])
                 data_shape.append(num_channels)
-                mca = np.array(spectrum)
+                mca = np.asarray(spectrum)
                 data = utils.reshape_data(mca, data_shape)
                 channels = range(1, num_channels + 1)
                 ds_name = "_" + key + "_"
@@ -390,10 +601,279 @@ class Writer(object):
     def write_ds(self, group, label, data, **attr):
         """*internal*: writes a dataset to the HDF5 file, records the SPEC name as an attribute"""
         clean_name = utils.clean_name(label)
+        if self.narrow and not self._growing_:  # new points might not fit
+            data, spec_dtype = self.narrow_data(data)
+            if spec_dtype is not None:
+                attr["spec_dtype"] = spec_dtype  # as read from SPEC
         eznx.write_dataset(
-            group, clean_name, data, spec_name=label, **attr
+            group,
+            clean_name,
+            data,
+            dataset_options=self.dataset_options(data),
+            spec_name=label,
+            **attr,
         )
 
+    def narrow_data(self, data):
+        """
+        *internal*: data in the smallest data type that holds it exactly
+
+        Returns ``(data, None)`` unless data is an array of numbers
+        (at least ``NARROW_MIN_SIZE`` items) that fits in a smaller
+        data type (see :func:`~spec2nexus.utils.narrow_dtype`), such as
+        counts in ``uint32``.  Then returns the array in that data type
+        and the name of the original data type (such as ``float64``).
+        """
+        if not isinstance(data, (tuple, list, np.ndarray)):
+            return data, None  # such as a scalar
+        try:
+            array = np.asarray(data)
+        except ValueError:
+            return data, None  # such as a ragged list
+        if array.size < NARROW_MIN_SIZE:
+            return data, None
+        dtype = utils.narrow_dtype(array)
+        if dtype is None:
+            return data, None
+        return array.astype(dtype), str(array.dtype)
+
+    def dataset_options(self, data):
+        """
+        *internal*: options (chunks & filters) to create the dataset for data
+
+        Returns a dictionary for ``create_dataset()``, empty
+        (contiguous, no filters) unless data is an array of numbers
+        with at least ``min_size`` items and filters were chosen.
+        Arrays of numbers in the ``live_scan`` are resizable along
+        their first axis (chunks of ``MIRROR_CHUNK_ROWS`` rows, at most),
+        so new points can be appended (see :meth:`extend_data`).
+        """
+        if self.compression is None and not self.shuffle and not self._growing_:
+            return {}
+        if not isinstance(data, (tuple, list, np.ndarray)):
+            return {}  # such as a scalar (see eznx.makeDataset())
+        try:
+            array = np.asarray(data)
+        except ValueError:
+            return {}  # such as a ragged list
+        if array.dtype.kind not in "biufc" or array.ndim == 0:
+            return {}
+        if self._growing_:
+            if 0 in array.shape[1:]:
+                return {}
+            shape = (max(array.shape[0], MIRROR_CHUNK_ROWS),) + array.shape[1:]
+            options = dict(
+                chunks=eznx.chunk_shape(shape, array.dtype.itemsize),
+                maxshape=(None,) + array.shape[1:],
+            )
+        elif array.size < max(1, self.min_size):
+            return {}
+        else:
+            options = dict(chunks=eznx.chunk_shape(array.shape, array.dtype.itemsize))
+        if self.compression is not None:
+            options["compression"] = self.compression
+            if self.compression_opts is not None:
+                options["compression_opts"] = self.compression_opts
+        if self.shuffle:
+            options["shuffle"] = True
+        return options
+
+
+class Mirror(object):
+
+    """
+    keeps a NeXus HDF5 file up to date with a SPEC data file, as SPEC writes it
+
+    :param obj writer: instance of :class:`Writer`
+    :param str hdf_file: name of NeXus HDF5 file to be written
+    :param bool overwrite: (default: ``False``) overwrite an existing
+        ``hdf_file`` that is not a mirror of this SPEC data file,
+        otherwise :meth:`poll` raises :class:`CannotUpdateFile`
+
+    Each :meth:`poll` reads only the new part of the SPEC data file
+    (see :meth:`~spec2nexus.spec.SpecDataFile.refresh`).  New points
+    of the last scan (the one SPEC is writing) are appended to its
+    columns and MCA spectra, which are written as resizable arrays.
+    Between polls, the file is open in HDF5 SWMR mode (single writer,
+    multiple readers).  A reader opens it with
+    ``h5py.File(hdf_file, "r", libver="latest", swmr=True)`` and calls
+    ``refresh()`` on a dataset to see its new points.
+
+    HDF5 does not allow new groups in SWMR mode.  When a new scan
+    starts, the file is closed and opened again (as with
+    ``Writer.save(update=True)``) to write the new scans, then
+    the previous (now complete) scan is written again, in full.
+    A reader must close the file for that:  until then, new scans
+    wait for the next poll.  The **NXentry** of the last scan has no
+    ``SPEC_scan_sha1`` attribute (it is not complete), so it is written
+    again by ``Writer.save(update=True)``.
+
+    SPEC might not have finished writing the last line of the file.
+    When the new content cannot be read (or the last scan cannot be
+    written), the HDF5 file keeps what was written before and the
+    next poll tries again.  Only new points are appended to the last
+    scan:  lines after its last point (such as ``#C`` comments) are
+    written when the scan is written again in full, once the next
+    scan starts (or by ``Writer.save(update=True)``).
+
+    .. autosummary::
+
+        ~close
+        ~poll
+        ~run
+    """
+
+    def __init__(self, writer, hdf_file, overwrite=False):
+        self.writer = writer
+        self.hdf_file = hdf_file
+        self.overwrite = overwrite
+        self.root = None  # open in SWMR mode, between polls
+
+    def poll(self):
+        """update the HDF5 file from the SPEC data file, return the scans written or extended"""
+        spec_data = self.writer.spec
+        try:
+            changed = spec_data.refresh()
+        except Exception as exc:
+            logger.info("SPEC data file not complete, try again at the next poll: %s", exc)
+            return []
+        if self.root is not None:
+            if changed is None:
+                return []  # SPEC data file not changed
+            key = self.writer.live_scan
+            same = self.writer._same_source_(self.root)
+            if same and key == next(reversed(spec_data.scans), None):
+                nxdata = self.root.get(f"S{key}/data")
+                scan = spec_data.getScan(key)
+                try:
+                    extended = nxdata is not None and self.writer.extend_data(nxdata, scan)
+                except Exception as exc:
+                    logger.info("scan %s not complete, try again at the next poll: %s", key, exc)
+                    return []
+                if extended:
+                    self.root.flush()
+                    return [key]
+            self.close()  # to write new scans
+        return self._write_scans_()
+
+    def _write_scans_(self):
+        """(internal) write new and changed scans, then open the file in SWMR mode"""
+        import h5py
+
+        writer = self.writer
+        try:
+            mode = "a"
+            if os.path.exists(self.hdf_file):
+                try:
+                    self._check_mirror_()
+                except CannotUpdateFile:
+                    if not self.overwrite:
+                        raise
+                    mode = "w"
+            root = h5py.File(self.hdf_file, mode, libver="latest")
+        except BlockingIOError:
+            return []  # a reader has the file open, try again at the next poll
+
+        try:
+            # last scan might not be complete: write it resizable
+            key = writer.live_scan = next(reversed(writer.spec.scans), None)
+            live, previous = f"S{key}", f"S{key}_previous"
+            if live in root:
+                root.move(live, previous)  # until the scan is written again
+            scan_list = writer._changed_scans_(root, list(writer.spec.scans))
+            written = writer._write_entries_(root, [k for k in scan_list if k != key], None)
+            try:
+                if key in scan_list:
+                    written += writer._write_entries_(root, [key], None)
+            except Exception as exc:
+                logger.info("scan %s not complete, try again at the next poll: %s", key, exc)
+                if live in root:
+                    del root[live]
+                if previous in root:
+                    root.move(previous, live)
+            if previous in root:
+                del root[previous]
+            root.swmr_mode = True
+        except Exception:
+            root.close()
+            raise
+        self.root = root
+        return written
+
+    def _check_mirror_(self):
+        """(internal) raise CannotUpdateFile unless the existing file is a mirror of this SPEC data file"""
+        import h5py
+
+        self.writer._check_update_(self.hdf_file)
+        with h5py.File(self.hdf_file, "r") as root:
+            if root.id.get_create_plist().get_version()[0] < 3:
+                # SWMR needs the newer file format (libver="latest")
+                raise CannotUpdateFile(f"not written by a mirror: {self.hdf_file}")
+
+    def close(self):
+        """close the HDF5 file"""
+        if self.root is not None:
+            self.root.close()
+            self.root = None
+
+    def run(self, interval=MIRROR_INTERVAL, polls=None, callback=None):
+        """
+        :meth:`poll` every ``interval`` seconds (``polls`` times or forever)
+
+        :param float interval: seconds between polls
+            (default: ``MIRROR_INTERVAL``)
+        :param int polls: number of polls (default: ``None``, until interrupted)
+        :param obj callback: (default: ``None``) function called
+            with the list of scans written or extended by each poll
+        """
+        count = 0
+        try:
+            while polls is None or count < polls:
+                if count > 0:
+                    time.sleep(interval)
+                written = self.poll()
+                if callback is not None and len(written) > 0:
+                    callback(written)
+                count += 1
+        finally:
+            self.close()
+
+
+def _scan_digest(scan):
+    """(internal) SHA-1 digest of the scan's text, to recognize a changed scan"""
+    return hashlib.sha1(scan.raw.encode()).hexdigest()
+
+
+_worker_writer = None  # Writer of each worker process in Writer.save(processes=N)
+
+
+def _init_worker(writer, spec_file, columnar, plugin_files):
+    """(internal) read the SPEC data file (index only) once in each worker process"""
+    global _worker_writer
+    import pathlib
+    import sys
+    from . import control_lines  # noqa: F401  (packaged plugins first, user plugins may override)
+    from . import plugin_core
+
+    for plugin_file in plugin_files:
+        # user plugins installed in the parent (already here if forked)
+        if pathlib.Path(plugin_file).stem not in sys.modules:
+            plugin_core.install_user_plugin(plugin_file)
+    writer.spec = spec.SpecDataFile(spec_file, indexed=True, columnar=columnar)
+    _worker_writer = writer
+
+
+def _entry_image(key):
+    """(internal) write one scan to an HDF5 file in memory, return the file image"""
+    import h5py
+
+    with h5py.File(
+        f"S{key}.h5", "w", driver="core", backing_store=False
+    ) as root:
+        _worker_writer.save_entry(root, key)
+        root.flush()
+        return root.id.get_file_image()
+
 # -----------------------------------------------------------------------------
 # :author:    Pete R. Jemian
 # :email:     prjemian@gmail.com